@@ -0,0 +1,43 @@
+from sqlalchemy import event, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Models whose inserts, updates and deletes are reported by GET /api/sync
+TRACKED_MODELS = (models.WorkoutSession, models.ExerciseLog)
+
+
+def next_change_seq(db: Session) -> int:
+    """
+    Take the next value of the change counter, in the caller's transaction.
+    The UPDATE holds SQLite's write lock until commit, so values become visible in increasing order.
+    """
+    stmt = sqlite_insert(models.ChangeCounter).values(id=1, value=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"], set_={"value": models.ChangeCounter.value + 1}
+    ).returning(models.ChangeCounter.value)
+    return db.execute(stmt).scalar_one()
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_changes(db: Session, flush_context, instances):
+    """Give every tracked row written by this flush a new change_seq and record deletions."""
+    changed = [obj for obj in db.new if isinstance(obj, TRACKED_MODELS)]
+    changed += [
+        obj for obj in db.dirty
+        if isinstance(obj, TRACKED_MODELS) and db.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in db.deleted if isinstance(obj, TRACKED_MODELS)]
+    if not changed and not deleted:
+        return
+
+    change_seq = next_change_seq(db)
+    for obj in changed:
+        obj.change_seq = change_seq
+    if deleted:
+        # One executemany; adding DeletedRecord objects would insert them one row at a time
+        db.execute(insert(models.DeletedRecord), [
+            {"table_name": obj.__tablename__, "record_id": obj.id, "change_seq": change_seq}
+            for obj in deleted
+        ])
@@ -1,18 +1,102 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from typing import Dict, Optional
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/workouts.db")
 
+
+def to_async_url(url: str) -> str:
+    """The aiosqlite form of a SQLite URL; other URLs are returned unchanged."""
+    for prefix in ("sqlite+pysqlite://", "sqlite://"):
+        if url.startswith(prefix):
+            return "sqlite+aiosqlite://" + url[len(prefix):]
+    return url
+
+
+# Same database as DATABASE_URL, opened through an async driver for the async routes
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+# Pragmas applied to every new SQLite connection. Set a variable to an empty string to
+# leave that pragma at SQLite's default.
+SQLITE_PRAGMAS = {
+    # WAL lets readers run alongside the single writer instead of blocking on it
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    # NORMAL is durable across app crashes in WAL mode and skips most fsyncs
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    # Wait this many ms for a lock instead of failing with "database is locked"
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    # Page cache per connection; negative values are KiB
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-16000"),
+    # Bytes of the database file to memory-map for reads
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(64 * 1024 * 1024)),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Connection pool sizing (ignored for in-memory SQLite, which uses a single connection)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
 # Ensure data directory exists
 os.makedirs("./data", exist_ok=True)
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, str]):
+    """Run PRAGMA statements on a raw DB-API connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if value != "":
+                cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _pool_args(url: str) -> dict:
+    # In-memory SQLite ("sqlite://" or ":memory:") is a single connection with no pool to size
+    if url.startswith("sqlite") and (url.endswith("://") or ":memory:" in url):
+        return {}
+    return dict(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+
+
+def _listen_for_pragmas(sync_engine, url: str, pragmas: Optional[Dict[str, str]]):
+    if not url.startswith("sqlite"):
+        return
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+def create_db_engine(url: str = DATABASE_URL, pragmas: Optional[Dict[str, str]] = None):
+    """Create an engine for url. SQLite connections get pragmas (default SQLITE_PRAGMAS) on connect."""
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, **_pool_args(url))
+    _listen_for_pragmas(engine, url, pragmas)
+    return engine
+
+
+def create_async_db_engine(url: str = ASYNC_DATABASE_URL, pragmas: Optional[Dict[str, str]] = None):
+    """Async counterpart of create_db_engine, with the same pool sizing and pragmas."""
+    engine = create_async_engine(url, **_pool_args(url))
+    _listen_for_pragmas(engine.sync_engine, url, pragmas)
+    return engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_db_engine()
+# expire_on_commit=False: attributes stay loaded after commit, since lazy loads cannot run
+# implicitly under asyncio
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -22,3 +106,7 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,36 @@
+import re
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import Dict, List
+
+from . import models
+
+
+def normalize_exercise_name(name: str) -> str:
+    """Catalog key for an exercise name: lowercase, punctuation and extra spaces removed."""
+    key = name.lower().strip()
+    key = re.sub(r'[:\-\*\.]+', ' ', key)  # Punctuation to spaces
+    return re.sub(r'\s+', ' ', key).strip()
+
+
+def get_catalog_ids(db: Session, names: List[str]) -> Dict[str, int]:
+    """
+    Map exercise names to catalog ids, creating catalog rows for new names.
+    Uses INSERT ... ON CONFLICT DO NOTHING, so concurrent imports cannot collide on a key.
+    """
+    keys = {}
+    for name in names:
+        keys.setdefault(normalize_exercise_name(name), name)
+    if not keys:
+        return {}
+    
+    db.execute(
+        sqlite_insert(models.ExerciseCatalog).on_conflict_do_nothing(index_elements=["name_key"]),
+        [{"name_key": key, "name": name} for key, name in keys.items()]
+    )
+    ids_by_key = dict(db.execute(
+        select(models.ExerciseCatalog.name_key, models.ExerciseCatalog.id)
+        .where(models.ExerciseCatalog.name_key.in_(keys))
+    ).all())
+    return {name: ids_by_key[normalize_exercise_name(name)] for name in names}
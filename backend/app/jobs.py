@@ -0,0 +1,85 @@
+import os
+import uuid
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of background threads running PDF imports
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "1"))
+
+# How long finished jobs stay pollable
+JOB_RETENTION = timedelta(hours=1)
+
+
+class Job:
+    """State of one background job. Updated by the worker, read by the API."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.state = "queued"  # queued -> running -> completed | failed
+        self.pages_done = 0
+        self.pages_total = 0
+        self.plan_id: Optional[int] = None
+        self.message: Optional[str] = None
+        self.workout_days_count = 0
+        self.exercises_count = 0
+        self.cache_hit = False
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    def set_progress(self, pages_done: int, pages_total: int):
+        self.pages_done = pages_done
+        self.pages_total = pages_total
+
+
+class JobQueue:
+    """
+    In-process job queue backed by a thread pool.
+    Jobs live in memory, so they are only visible to the process that queued them.
+    """
+
+    def __init__(self, max_workers: int = UPLOAD_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Dict[str, Any]], *args) -> Job:
+        """Queue fn(job, *args). Its returned dict is copied onto the job when it completes."""
+        job = Job()
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn: Callable[..., Dict[str, Any]], args: tuple):
+        job.state = "running"
+        try:
+            result = fn(job, *args)
+            for key, value in (result or {}).items():
+                setattr(job, key, value)
+            job.state = "completed"
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.message = str(e)
+            job.state = "failed"
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _prune(self):
+        """Drop finished jobs past the retention window."""
+        cutoff = datetime.utcnow() - JOB_RETENTION
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
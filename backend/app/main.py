@@ -1,19 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
+import asyncio
 import os
 
-from .database import engine, Base
+from .database import engine
+from .metrics import REGISTRY, MetricsMiddleware
+from .query_profiler import QueryProfilerMiddleware
 from . import models  # Import models to register them with Base
-from .routes import router
+from .migrations import run_migrations
+from .routes import parser_process, router
+from . import uploads
+
+# Set to 1 to start without checking the schema, for a database already migrated by this version
+SKIP_MIGRATIONS = os.getenv("SKIP_MIGRATIONS", "0") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables and bring older databases up to date before serving requests.
+    # Run here rather than at import, so importing the app stays cheap.
+    if not SKIP_MIGRATIONS:
+        run_migrations(engine)
+    # Remove uploads no plan refers to any more, every UPLOAD_SWEEP_INTERVAL seconds
+    sweeper = None
+    if uploads.UPLOAD_SWEEP_INTERVAL > 0:
+        sweeper = asyncio.create_task(uploads.sweep_periodically())
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+    parser_process.shutdown()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Gym Workout API",
     description="API for managing workout plans, sessions, and tracking progress",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware - allow all origins for development
@@ -23,15 +47,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Per-route request counts, latency and response sizes, exported at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Query count and DB time per request, in a Server-Timing header (QUERY_PROFILING=0 to turn off)
+app.add_middleware(QueryProfilerMiddleware)
+
 # Include API routes
-app.include_router(router, prefix="/api")
+app.include_router(router)
 
-# Serve uploaded files
-UPLOAD_DIR = "./data/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+# Serve uploaded files: immutable, content-addressed, with range requests
+app.include_router(uploads.router)
 
 
 @app.get("/")
@@ -47,3 +76,9 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
@@ -0,0 +1,217 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Seconds; covers cached reads (sub-millisecond) up to slow plan reads
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+PARSE_SECONDS_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+PAGE_BUCKETS = (1, 5, 10, 25, 50, 100, 200, 500)
+
+# Label for requests that matched no route, so unknown paths do not create new series
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    # Integers in full: "%g" would print 1234567 as 1.23457e+06
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(sample name, formatted labels, value) for every series."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines += [f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()]
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A metric without labels is exported as 0 before its first update
+        self._values: Dict[Tuple[str, ...], float] = {} if self.label_names else {(): 0}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, _format_labels(self.label_names, labels), value) for labels, value in values]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {} if self.label_names else {(): 0}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, _format_labels(self.label_names, labels), value) for labels, value in values]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram. Each series stores per-bucket counts (+Inf last), sum and count."""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        if not self.label_names:
+            self._series[()] = [0] * (len(self.buckets) + 3)
+
+    def observe(self, value: float, *labels: str):
+        # bisect_left: a value equal to a bound counts in that bucket ("le")
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        result = []
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                result.append((f"{self.name}_bucket",
+                               _format_labels((*self.label_names, "le"), (*labels, le)), cumulative))
+            plain = _format_labels(self.label_names, labels)
+            result.append((f"{self.name}_sum", plain, values[-2]))
+            result.append((f"{self.name}_count", plain, values[-1]))
+        return result
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ============== HTTP ==============
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.", ("method", "route")
+)
+http_response_size = Histogram(
+    "http_response_size_bytes", "Response body size.", ("method", "route"), buckets=SIZE_BUCKETS
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "Requests currently being handled.")
+
+# ============== PDF Parser ==============
+
+pdf_parse_duration = Histogram(
+    "pdf_parse_duration_seconds", "WorkoutPDFParser.parse_pdf run time.", ("outcome",),
+    buckets=PARSE_SECONDS_BUCKETS
+)
+pdf_parse_pages = Histogram(
+    "pdf_parse_pages", "Pages per parsed PDF.", buckets=PAGE_BUCKETS
+)
+
+
+def _route_label(scope) -> str:
+    """The matched route's path template, or the mount path for mounted apps."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    if "app_root_path" in scope:
+        return scope["root_path"][len(scope["app_root_path"]):] or UNMATCHED_ROUTE
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, latency, response size and in-flight requests.
+    Routes are labelled by their path template ("/api/plans/{plan_id}"), read from the scope
+    once routing has run. Plain ASGI rather than BaseHTTPMiddleware, which costs an extra task
+    and stream per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500  # If the app raises before starting a response
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            path = _route_label(scope)
+            method = scope["method"]
+            http_requests.inc(method, path, str(status))
+            http_request_duration.observe(time.perf_counter() - start, method, path)
+            http_response_size.observe(size, method, path)
@@ -0,0 +1,141 @@
+import logging
+import os
+import shutil
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import Base
+from .change_tracking import TRACKED_MODELS, next_change_seq
+from .exercise_catalog import get_catalog_ids
+from .rollups import rebuild_rollups
+from .uploads import STORED_NAME_RE, UPLOAD_DIR, hash_file, stored_filename
+
+logger = logging.getLogger(__name__)
+
+# Columns added to existing tables after their first release: (table, column, SQL type).
+# create_all() only creates missing tables, so these are added to older databases here.
+ADDED_COLUMNS = [
+    ("exercises", "catalog_id", "INTEGER REFERENCES exercise_catalog(id)"),
+    ("workout_sessions", "idempotency_key", "VARCHAR(64)"),
+    ("workout_sessions", "change_seq", "INTEGER"),
+    ("exercise_logs", "idempotency_key", "VARCHAR(64)"),
+    ("exercise_logs", "change_seq", "INTEGER"),
+    ("workout_plans", "snapshot", "BLOB"),
+    ("workout_plans", "snapshot_version", "INTEGER"),
+    ("workout_days", "snapshot", "BLOB"),
+    ("workout_days", "snapshot_version", "INTEGER"),
+]
+
+
+def run_migrations(engine: Engine):
+    """
+    Bring an existing database up to the current models. Safe to run on every startup:
+    each step checks what is already there first.
+    """
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, column, sql_type in ADDED_COLUMNS:
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing:
+                logger.info(f"Adding column {table}.{column}")
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}"))
+
+        # Indexes declared on models, including ones on tables that already existed
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+    _backfill_exercise_catalog(engine)
+    _backfill_change_seq(engine)
+    _backfill_training_rollups(engine)
+    _backfill_upload_names(engine)
+
+
+def _backfill_exercise_catalog(engine: Engine):
+    """Link exercises created before the catalog existed to their catalog rows."""
+    with Session(engine) as db:
+        rows = db.execute(
+            select(models.Exercise.id, models.Exercise.name)
+            .where(models.Exercise.catalog_id.is_(None))
+        ).all()
+        if not rows:
+            return
+
+        catalog_ids = get_catalog_ids(db, [name for _, name in rows])
+        db.execute(
+            update(models.Exercise),
+            [{"id": exercise_id, "catalog_id": catalog_ids[name]} for exercise_id, name in rows]
+        )
+        db.commit()
+        logger.info(f"Linked {len(rows)} exercises to the exercise catalog")
+
+
+def _backfill_change_seq(engine: Engine):
+    """Stamp sessions and logs written before change tracking, so a full sync includes them."""
+    with Session(engine) as db:
+        pending = [
+            model for model in TRACKED_MODELS
+            if db.scalar(select(model.id).where(model.change_seq.is_(None)).limit(1)) is not None
+        ]
+        if not pending:
+            return
+
+        change_seq = next_change_seq(db)
+        for model in pending:
+            db.execute(
+                update(model).where(model.change_seq.is_(None)).values(change_seq=change_seq)
+            )
+        db.commit()
+        logger.info(f"Assigned change_seq {change_seq} to existing sessions and logs")
+
+
+def _backfill_training_rollups(engine: Engine):
+    """Build the rollup rows for sets logged before the rollup table existed."""
+    with Session(engine) as db:
+        if db.scalar(select(models.TrainingRollup.id).limit(1)) is not None:
+            return
+        if db.scalar(select(models.ExerciseLog.id).limit(1)) is None and db.scalar(
+            select(models.WorkoutSession.id).where(models.WorkoutSession.completed_at.isnot(None)).limit(1)
+        ) is None:
+            return
+        rebuild_rollups(db)
+        db.commit()
+        logger.info("Built training rollups from existing sessions and logs")
+
+
+def _backfill_upload_names(engine: Engine):
+    """
+    Point plans at a content-hash copy of uploads saved under their original filename. The
+    original file is kept: it may be a tracked file such as the sample PDF, and the sweeper
+    ignores names that are not content hashes.
+    """
+    with Session(engine) as db:
+        plans = db.scalars(
+            select(models.WorkoutPlan).where(models.WorkoutPlan.pdf_filename.isnot(None))
+        ).all()
+        legacy = [plan for plan in plans if not STORED_NAME_RE.match(plan.pdf_filename)]
+        if not legacy:
+            return
+
+        renamed = {}
+        for plan in legacy:
+            old_path = os.path.join(UPLOAD_DIR, os.path.basename(plan.pdf_filename))
+            if old_path not in renamed:
+                if not os.path.isfile(old_path):
+                    continue
+                new_name = stored_filename(hash_file(old_path))
+                new_path = os.path.join(UPLOAD_DIR, new_name)
+                if not os.path.exists(new_path):
+                    try:
+                        os.link(old_path, new_path)
+                    except OSError:
+                        shutil.copyfile(old_path, new_path)
+                renamed[old_path] = new_name
+            plan.pdf_filename = renamed[old_path]
+            plan.snapshot_version = None  # The stored JSON has the old name; rebuilt on next read
+        db.commit()
+        logger.info(f"Stored {len(renamed)} uploads under their content hash")
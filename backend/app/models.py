@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, Date, DateTime, Float, Index, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from .database import Base
 
@@ -12,6 +12,9 @@ class WorkoutPlan(Base):
     description = Column(Text, nullable=True)
     pdf_filename = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Serialized GET /api/plans/{id} response (see snapshots.py); deferred so listings skip it
+    snapshot = deferred(Column(LargeBinary, nullable=True))
+    snapshot_version = Column(Integer, nullable=True)
     
     workout_days = relationship("WorkoutDay", back_populates="plan", cascade="all, delete-orphan")
 
@@ -20,10 +23,13 @@ class WorkoutDay(Base):
     __tablename__ = "workout_days"
     
     id = Column(Integer, primary_key=True, index=True)
-    plan_id = Column(Integer, ForeignKey("workout_plans.id"), nullable=False)
+    plan_id = Column(Integer, ForeignKey("workout_plans.id"), nullable=False, index=True)
     name = Column(String(255), nullable=False)  # e.g., "Day 1 - Back & Biceps"
     day_number = Column(Integer, nullable=False)
     muscle_groups = Column(String(255), nullable=True)  # e.g., "Back, Biceps"
+    # Serialized GET /api/days/{id} response
+    snapshot = deferred(Column(LargeBinary, nullable=True))
+    snapshot_version = Column(Integer, nullable=True)
     
     plan = relationship("WorkoutPlan", back_populates="workout_days")
     circuits = relationship("Circuit", back_populates="workout_day", cascade="all, delete-orphan")
@@ -33,7 +39,7 @@ class Circuit(Base):
     __tablename__ = "circuits"
     
     id = Column(Integer, primary_key=True, index=True)
-    workout_day_id = Column(Integer, ForeignKey("workout_days.id"), nullable=False)
+    workout_day_id = Column(Integer, ForeignKey("workout_days.id"), nullable=False, index=True)
     circuit_number = Column(Integer, nullable=False)
     name = Column(String(255), nullable=True)  # e.g., "Circuit 1"
     rounds = Column(Integer, default=3)
@@ -46,7 +52,7 @@ class Exercise(Base):
     __tablename__ = "exercises"
     
     id = Column(Integer, primary_key=True, index=True)
-    circuit_id = Column(Integer, ForeignKey("circuits.id"), nullable=False)
+    circuit_id = Column(Integer, ForeignKey("circuits.id"), nullable=False, index=True)
     name = Column(String(255), nullable=False)
     order = Column(Integer, nullable=False)
     sets = Column(String(50), nullable=True)  # e.g., "3" or "3-4"
@@ -55,34 +61,53 @@ class Exercise(Base):
     notes = Column(Text, nullable=True)
     video_url = Column(String(500), nullable=True)
     image_url = Column(String(500), nullable=True)
+    catalog_id = Column(Integer, ForeignKey("exercise_catalog.id"), nullable=True, index=True)
     
     circuit = relationship("Circuit", back_populates="exercises")
+    catalog = relationship("ExerciseCatalog")
+
+
+class ExerciseCatalog(Base):
+    """One row per distinct exercise, shared by every plan's Exercise rows with that name."""
+    __tablename__ = "exercise_catalog"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name_key = Column(String(255), nullable=False, unique=True, index=True)  # normalized name
+    name = Column(String(255), nullable=False)  # display name, as first seen
 
 
 class WorkoutSession(Base):
     __tablename__ = "workout_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
-    workout_day_id = Column(Integer, ForeignKey("workout_days.id"), nullable=False)
-    started_at = Column(DateTime, default=datetime.utcnow)
+    workout_day_id = Column(Integer, ForeignKey("workout_days.id"), nullable=False, index=True)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
     completed_at = Column(DateTime, nullable=True)
     duration_minutes = Column(Integer, nullable=True)
     notes = Column(Text, nullable=True)
+    idempotency_key = Column(String(64), nullable=True, unique=True, index=True)  # client-supplied
+    change_seq = Column(Integer, nullable=True, index=True)  # see change_tracking.py
     
     exercise_logs = relationship("ExerciseLog", back_populates="session", cascade="all, delete-orphan")
 
 
 class ExerciseLog(Base):
     __tablename__ = "exercise_logs"
+    __table_args__ = (
+        # Exercise history: one exercise's logs, in time order
+        Index("ix_exercise_logs_exercise_id_logged_at", "exercise_id", "logged_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("workout_sessions.id"), nullable=False)
+    session_id = Column(Integer, ForeignKey("workout_sessions.id"), nullable=False, index=True)
     exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
     set_number = Column(Integer, nullable=False)
     reps_completed = Column(Integer, nullable=True)
     weight_used = Column(Float, nullable=True)
     completed = Column(Boolean, default=False)
     logged_at = Column(DateTime, default=datetime.utcnow)
+    idempotency_key = Column(String(64), nullable=True, unique=True, index=True)  # client-supplied
+    change_seq = Column(Integer, nullable=True, index=True)  # see change_tracking.py
     
     session = relationship("WorkoutSession", back_populates="exercise_logs")
 
@@ -97,3 +122,41 @@ class UserStats(Base):
     total_workout_minutes = Column(Integer, default=0)
     last_workout_date = Column(DateTime, nullable=True)
 
+
+class ChangeCounter(Base):
+    """Single-row counter handing out change_seq values for delta sync."""
+    __tablename__ = "change_counter"
+    
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class DeletedRecord(Base):
+    """Tombstone for a deleted session or log, so /api/sync can report the deletion."""
+    __tablename__ = "deleted_records"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(64), nullable=False)
+    record_id = Column(Integer, nullable=False)
+    change_seq = Column(Integer, nullable=False, index=True)
+
+
+class TrainingRollup(Base):
+    """
+    Training totals for one day or ISO week, kept up to date as sets are logged and sessions
+    completed (see rollups.py). muscle_group "" holds the totals across all groups.
+    """
+    __tablename__ = "training_rollups"
+    __table_args__ = (
+        Index("ix_training_rollups_key", "period", "period_start", "muscle_group", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(8), nullable=False)  # "day" or "week"
+    period_start = Column(Date, nullable=False)  # the day, or the Monday of the ISO week
+    muscle_group = Column(String(64), nullable=False, default="")
+    sessions = Column(Integer, nullable=False, default=0)
+    sets = Column(Integer, nullable=False, default=0)
+    reps = Column(Integer, nullable=False, default=0)
+    tonnage = Column(Float, nullable=False, default=0.0)  # sum of weight x reps
+    minutes = Column(Integer, nullable=False, default=0)
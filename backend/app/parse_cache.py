@@ -0,0 +1,81 @@
+import os
+import re
+import json
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_DIR = "./data/parse_cache"
+
+ENTRY_NAME_RE = re.compile(r"^([0-9a-f]{64})-v(\d+)\.json$")
+
+
+class ParseCache:
+    """
+    On-disk cache of parser output, keyed by the PDF's SHA-256 and the parser version.
+    A parser version bump makes older entries unreachable, so they never need invalidating;
+    prune() deletes them, along with entries for PDFs that are no longer stored.
+    """
+
+    def __init__(self, cache_dir: str = PARSE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, content_hash: str, parser_version: int) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}-v{parser_version}.json")
+
+    def get(self, content_hash: str, parser_version: int) -> Optional[Dict[str, Any]]:
+        """Return cached parser output, or None on a miss."""
+        try:
+            with open(self._path(content_hash, parser_version)) as f:
+                parsed = json.load(f)
+        except (OSError, ValueError):
+            parsed = None
+
+        with self._lock:
+            if parsed is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return parsed
+
+    def put(self, content_hash: str, parser_version: int, parsed: Dict[str, Any]):
+        """Store parser output. Written to a temp file first so readers never see partial JSON."""
+        path = self._path(content_hash, parser_version)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(parsed, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write parse cache entry {path}: {e}")
+
+    def prune(self, parser_version: int, stored_hashes: Set[str]) -> List[str]:
+        """
+        Delete entries written by another parser version, and entries whose PDF's hash is not
+        in stored_hashes. An entry is only written while its PDF is stored, so none are in use.
+        Returns the deleted file names.
+        """
+        removed = []
+        for entry in os.scandir(self.cache_dir):
+            match = ENTRY_NAME_RE.match(entry.name)
+            if not match:
+                continue
+            content_hash, version = match.group(1), int(match.group(2))
+            if version == parser_version and content_hash in stored_hashes:
+                continue
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            removed.append(entry.name)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
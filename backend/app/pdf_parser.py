@@ -1,11 +1,257 @@
-import pdfplumber
 import re
-from typing import List, Dict, Any, Optional
+import os
+import time
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator
 import logging
 
+from .metrics import pdf_parse_duration, pdf_parse_pages
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever parse output changes, so cached results from older parsers are ignored
+PARSER_VERSION = 1
+
+# Words that mark a table row containing "day" as a day header
+DAY_KEYWORDS_RE = re.compile('push|pull|leg|upper|lower|chest|back|arm')
+
+# Lines at the top of the document searched for the plan name
+PLAN_NAME_LINES = 10
+
+# Number of processes used to extract pages; 1 extracts them in the parsing process itself
+PDF_PARSER_WORKERS = int(os.getenv("PDF_PARSER_WORKERS", "1"))
+
+# Parses run on a job-queue thread inside the server, and forking a multi-threaded process can
+# leave a lock (e.g. logging's) held in the child. Workers start clean instead; forkserver where
+# the platform has it (not Windows), spawn elsewhere.
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _extract_page(page, want_text: Callable[[List], bool]) -> Tuple[List, Optional[str]]:
+    """
+    Read a page's tables, and its text only if want_text(tables) asks for it (else None).
+    Tables and text are both derived from the page's parsed layout objects, which pdfplumber
+    caches, so the content stream is interpreted once; the cache is released afterwards.
+    """
+    tables = [table.extract() for table in page.find_tables()]
+    text = page.extract_text() if want_text(tables) else None
+    page.close()
+    return tables, text
+
+
+def _has_no_tables(tables: List) -> bool:
+    return not tables
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[List, Optional[str]]]:
+    """
+    Extract (tables, text) for pages [start, end). Runs inside pool workers.
+    Text is only read for pages without tables; the caller fills in any other text it needs.
+    """
+    import pdfplumber  # Deferred like in _iter_pages; workers import it on their first range
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_extract_page(page, _has_no_tables) for page in pdf.pages[start:end]]
+
+
+class LineClassifier:
+    """
+    Prebuilt matcher for the parser's keyword lists.
+    Skip patterns and exercise keywords are compiled into one alternation, so a line is
+    classified with a single regex search instead of one search/substring scan per entry.
+    """
+
+    SKIP = "skip"
+    EXERCISE = "exercise"
+
+    def __init__(self, skip_patterns: Tuple[str, ...], exercise_keywords: Tuple[str, ...],
+                 muscle_groups: Tuple[str, ...]):
+        # Skip patterns are tried first; they are anchored, so they only ever match at
+        # position 0, where they take priority over any keyword.
+        skip = '|'.join(f'(?:{pattern})' for pattern in skip_patterns)
+        keywords = self._alternation(exercise_keywords)
+        self._line_re = re.compile(f'(?P<{self.SKIP}>{skip})|(?P<{self.EXERCISE}>{keywords})')
+        
+        self.muscle_groups = muscle_groups
+        self._muscle_re = re.compile(self._alternation(muscle_groups))
+    
+    @staticmethod
+    def _alternation(keywords: Tuple[str, ...]) -> str:
+        # Longest first, so the longest keyword at a position wins
+        return '|'.join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))
+    
+    def classify(self, text_lower: str) -> Optional[str]:
+        """Return SKIP for note lines, EXERCISE if an exercise keyword occurs, else None."""
+        match = self._line_re.search(text_lower)
+        return match.lastgroup if match else None
+    
+    def find_muscle_groups(self, text_lower: str) -> List[str]:
+        """Return the muscle groups occurring in the text, in muscle_groups order."""
+        # Most lines name no muscle group, and one search rejects them. Lines that do can
+        # name several, possibly overlapping groups, so those use exact substring checks.
+        if not self._muscle_re.search(text_lower):
+            return []
+        return [mg for mg in self.muscle_groups if mg in text_lower]
+
+
+@lru_cache(maxsize=None)
+def _get_classifier(skip_patterns: Tuple[str, ...], exercise_keywords: Tuple[str, ...],
+                    muscle_groups: Tuple[str, ...]) -> LineClassifier:
+    """Build a classifier once per distinct keyword set; parsers share it."""
+    return LineClassifier(skip_patterns, exercise_keywords, muscle_groups)
+
+
+class _TableDayBuilder:
+    """
+    Builds workout days from table rows as they arrive.
+    Every day header row closes the previous day, so rows never need to be held.
+    """
+
+    def __init__(self, parser: "WorkoutPDFParser"):
+        self.parser = parser
+        self.workout_days = []
+        self.current_day = None
+        self.current_circuit = None
+        self.exercise_order = 1
+    
+    def feed_table(self, table: List):
+        if not table:
+            return
+        for row in table:
+            self.feed_row(row)
+    
+    def feed_row(self, row: List):
+        if not row or all(cell is None or cell == '' for cell in row):
+            return
+        
+        # Clean row
+        row = [str(cell).strip() if cell else '' for cell in row]
+        
+        # Check if this is a day header (Week X, Day Y)
+        row_text = ' '.join(row).lower()
+        day_match = re.search(r'week\s*(\d+).*day\s*(\d+)\s*[:\-]?\s*(\w+)?', row_text, re.IGNORECASE)
+        if day_match or 'day' in row_text and DAY_KEYWORDS_RE.search(row_text):
+            # Save previous day
+            self._close_day()
+            
+            # Extract day info
+            day_name = ' '.join(row).strip()
+            day_num = len(self.workout_days) + 1
+            muscle_groups = self.parser._extract_muscle_groups(day_name)
+            
+            if day_match:
+                week = day_match.group(1)
+                day = day_match.group(2)
+                workout_type = day_match.group(3) or ""
+                day_name = f"Week {week}, Day {day}"
+                if workout_type:
+                    day_name += f": {workout_type.upper()}"
+            
+            self.current_day = {
+                "name": day_name,
+                "day_number": day_num,
+                "muscle_groups": muscle_groups,
+                "circuits": []
+            }
+            self.current_circuit = {
+                "circuit_number": 1,
+                "name": "Circuit 1",
+                "rounds": 3,
+                "exercises": []
+            }
+            self.exercise_order = 1
+            return
+        
+        # Check if this is a header row
+        if any(h in row_text for h in ['exercise', 'sets', 'reps', 'notes']):
+            return
+        
+        # Try to parse as exercise row
+        exercise = self.parser._parse_table_row(row, self.exercise_order)
+        if exercise and self.current_circuit is not None:
+            self.current_circuit["exercises"].append(exercise)
+            self.exercise_order += 1
+    
+    def _close_day(self):
+        if self.current_day and self.current_circuit:
+            if self.current_circuit.get("exercises"):
+                self.current_day["circuits"].append(self.current_circuit)
+            if self.current_day.get("circuits"):
+                self.workout_days.append(self.current_day)
+    
+    def finish(self) -> List[Dict[str, Any]]:
+        """Add the last day/circuit and return all workout days."""
+        self._close_day()
+        self.current_day = self.current_circuit = None
+        return self.workout_days
+
+
+class _TextDayBuilder:
+    """
+    Builds workout days from text lines as they arrive.
+    Only the lines of the day currently being read are held; a day header line closes it.
+    """
+
+    # Lines matching these start a new day (header lines are short)
+    DAY_HEADER_RE = re.compile('|'.join([
+        r'week\s*\d+.*day\s*\d+',
+        r'day\s*\d+',
+        r'workout\s*\d+',
+        r'session\s*\d+'
+    ]))
+    DAY_HEADER_MAX_LENGTH = 80
+
+    def __init__(self, parser: "WorkoutPDFParser"):
+        self.parser = parser
+        self.head_lines = []  # First lines, for the plan name
+        self.section = []
+        self.line_count = 0
+        self.day_num = 0
+        self.workout_days = []
+    
+    def feed_text(self, text: str):
+        for line in text.split('\n'):
+            line = line.strip()
+            if line:
+                self.feed_line(line)
+    
+    def feed_line(self, line: str):
+        if len(self.head_lines) < PLAN_NAME_LINES:
+            self.head_lines.append(line)
+        
+        if (self.line_count > 0 and len(line) < self.DAY_HEADER_MAX_LENGTH
+                and self.DAY_HEADER_RE.search(line.lower())):
+            self._close_section()
+        
+        self.section.append(line)
+        self.line_count += 1
+    
+    def _close_section(self):
+        if not self.section:
+            return
+        self.day_num += 1
+        workout_day = self.parser._parse_day(self.section, self.day_num)
+        if workout_day["circuits"]:
+            self.workout_days.append(workout_day)
+        self.section = []
+    
+    def finish(self) -> Dict[str, Any]:
+        """Parse the last day and return the plan."""
+        self._close_section()
+        # Exercise lines are recognized line by line, so if no day produced a circuit,
+        # treating the whole text as one day would not produce one either.
+        return {
+            "name": self.parser._extract_plan_name(self.head_lines),
+            "workout_days": self.workout_days
+        }
+
 
 class WorkoutPDFParser:
     """
@@ -14,7 +260,9 @@ class WorkoutPDFParser:
     Optimized for fitness program PDFs like Nick Bare's Embrace the Suck.
     """
     
-    def __init__(self):
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(1, workers if workers is not None else PDF_PARSER_WORKERS)
+        
         self.common_exercises = [
             "press", "curl", "row", "squat", "deadlift", "lunge", "fly",
             "extension", "raise", "pulldown", "pushup", "push-up", "push up",
@@ -47,117 +295,138 @@ class WorkoutPDFParser:
             r'^\d+\s*rm\s*x',  # Like "3-RM x 3 sets"
             r'^rm\s*x',
         ]
+        
+        self.classifier = _get_classifier(
+            tuple(self.skip_patterns), tuple(self.common_exercises), tuple(self.muscle_groups)
+        )
     
-    def parse_pdf(self, pdf_path: str) -> Dict[str, Any]:
-        """Parse a workout PDF and extract structured data."""
+    def parse_pdf(
+        self,
+        pdf_path: str,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Parse a workout PDF and extract structured data.
+        Pages stream through the day builders one at a time, so memory stays flat as the
+        page count grows.
+        progress, if given, is called with (pages_done, pages_total) as extraction advances.
+        """
+        start = time.perf_counter()
+        page_count = 0
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                all_tables = []
-                full_text = ""
-                
-                for page in pdf.pages:
-                    # Try to extract tables first (better for structured PDFs)
-                    tables = page.extract_tables()
-                    if tables:
-                        all_tables.extend(tables)
-                    
-                    # Also get text
-                    text = page.extract_text()
-                    if text:
-                        full_text += text + "\n"
+            table_builder = _TableDayBuilder(self)
+            text_builder = _TextDayBuilder(self)
+            head_lines = []  # First lines of the document, for the plan name
+            table_count = 0
+            char_count = 0
+            
+            def want_text(tables: List) -> bool:
+                # Full text is only parsed while the PDF may turn out to have no tables at
+                # all; after that, only its first lines are needed, for the plan name.
+                return not (table_count or tables) or len(head_lines) < PLAN_NAME_LINES
+            
+            for tables, text in self._iter_pages(pdf_path, want_text, progress):
+                page_count += 1
+                # Tables first (better for structured PDFs)
+                for table in tables or []:
+                    table_builder.feed_table(table)
+                table_count += len(tables or [])
                 
-                logger.info(f"Extracted {len(full_text)} characters from PDF")
-                logger.info(f"Found {len(all_tables)} tables")
+                if text:
+                    char_count += len(text) + 1
+                    if len(head_lines) < PLAN_NAME_LINES:
+                        head_lines.extend(text.split('\n')[:PLAN_NAME_LINES - len(head_lines)])
+                    # Text parsing is only the fallback for PDFs without any tables
+                    if not table_count:
+                        text_builder.feed_text(text)
+            
+            logger.info(f"Extracted {char_count} characters from PDF")
+            logger.info(f"Found {table_count} tables")
+            
+            # If we have tables, use table parsing (better for Nick Bare format)
+            if table_count:
+                result = {
+                    "name": self._extract_plan_name(head_lines),
+                    "workout_days": table_builder.finish()
+                }
+            else:
+                result = text_builder.finish()
                 
-                # If we have tables, use table parsing (better for Nick Bare format)
-                if all_tables:
-                    return self._parse_tables(all_tables, full_text)
-                else:
-                    return self._parse_workout_text(full_text)
-                    
         except Exception as e:
+            pdf_parse_duration.observe(time.perf_counter() - start, "error")
             logger.error(f"Error parsing PDF: {e}")
             raise
+        
+        pdf_parse_duration.observe(time.perf_counter() - start, "ok")
+        pdf_parse_pages.observe(page_count)
+        return result
+    
+    def _iter_pages(
+        self,
+        pdf_path: str,
+        want_text: Callable[[List], bool],
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[Tuple[List, Optional[str]]]:
+        """
+        Yield (tables, text) for each page, in page order.
+        want_text(tables) is asked per page, as it is reached, whether its text is needed;
+        text is None for pages where it was not.
+        """
+        # pdfplumber pulls in pdfminer and Pillow; imported on the first parse rather than
+        # at startup, since most processes never parse a PDF
+        import pdfplumber
+        
+        with pdfplumber.open(pdf_path) as pdf:
+            page_count = len(pdf.pages)
+            if self.workers > 1 and page_count > 1:
+                yield from self._iter_pages_parallel(pdf, pdf_path, want_text, progress)
+                return
+            
+            for page_num, page in enumerate(pdf.pages, 1):
+                yield _extract_page(page, want_text)
+                if progress:
+                    progress(page_num, page_count)
+    
+    def _iter_pages_parallel(
+        self,
+        pdf,
+        pdf_path: str,
+        want_text: Callable[[List], bool],
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[Tuple[List, Optional[str]]]:
+        """Extract pages in contiguous ranges across a process pool, yielding in page order."""
+        page_count = len(pdf.pages)
+        workers = min(self.workers, page_count)
+        chunk = -(-page_count // workers)  # ceil division
+        starts = list(range(0, page_count, chunk))
+        ends = [min(start + chunk, page_count) for start in starts]
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as pool:
+            # map() yields results in submission order, so pages stay ordered
+            results = pool.map(_extract_page_range, [pdf_path] * len(starts), starts, ends)
+            for start, end, chunk_pages in zip(starts, ends, results):
+                for page_index, (tables, text) in enumerate(chunk_pages, start):
+                    if text is None and want_text(tables):
+                        # Workers skip text on table pages; read it here if still needed
+                        page = pdf.pages[page_index]
+                        text = page.extract_text()
+                        page.close()
+                    yield tables, text
+                if progress:
+                    progress(end, page_count)
+        
+        logger.info(f"Extracted {page_count} pages using {workers} worker processes")
     
     def _parse_tables(self, tables: List, full_text: str) -> Dict[str, Any]:
         """Parse workout data from PDF tables."""
-        result = {
-            "name": self._extract_plan_name(full_text.split('\n')),
-            "workout_days": []
-        }
-        
-        current_day = None
-        current_circuit = None
-        exercise_order = 1
-        
+        builder = _TableDayBuilder(self)
         for table in tables:
-            if not table:
-                continue
-                
-            for row in table:
-                if not row or all(cell is None or cell == '' for cell in row):
-                    continue
-                
-                # Clean row
-                row = [str(cell).strip() if cell else '' for cell in row]
-                
-                # Check if this is a day header (Week X, Day Y)
-                row_text = ' '.join(row).lower()
-                day_match = re.search(r'week\s*(\d+).*day\s*(\d+)\s*[:\-]?\s*(\w+)?', row_text, re.IGNORECASE)
-                if day_match or 'day' in row_text and any(mg in row_text for mg in ['push', 'pull', 'leg', 'upper', 'lower', 'chest', 'back', 'arm']):
-                    # Save previous day
-                    if current_day and current_circuit:
-                        if current_circuit.get("exercises"):
-                            current_day["circuits"].append(current_circuit)
-                        if current_day.get("circuits"):
-                            result["workout_days"].append(current_day)
-                    
-                    # Extract day info
-                    day_name = ' '.join(row).strip()
-                    day_num = len(result["workout_days"]) + 1
-                    muscle_groups = self._extract_muscle_groups(day_name)
-                    
-                    if day_match:
-                        week = day_match.group(1)
-                        day = day_match.group(2)
-                        workout_type = day_match.group(3) or ""
-                        day_name = f"Week {week}, Day {day}"
-                        if workout_type:
-                            day_name += f": {workout_type.upper()}"
-                    
-                    current_day = {
-                        "name": day_name,
-                        "day_number": day_num,
-                        "muscle_groups": muscle_groups,
-                        "circuits": []
-                    }
-                    current_circuit = {
-                        "circuit_number": 1,
-                        "name": "Circuit 1",
-                        "rounds": 3,
-                        "exercises": []
-                    }
-                    exercise_order = 1
-                    continue
-                
-                # Check if this is a header row
-                if any(h in row_text for h in ['exercise', 'sets', 'reps', 'notes']):
-                    continue
-                
-                # Try to parse as exercise row
-                exercise = self._parse_table_row(row, exercise_order)
-                if exercise and current_circuit is not None:
-                    current_circuit["exercises"].append(exercise)
-                    exercise_order += 1
-        
-        # Add last day/circuit
-        if current_day and current_circuit:
-            if current_circuit.get("exercises"):
-                current_day["circuits"].append(current_circuit)
-            if current_day.get("circuits"):
-                result["workout_days"].append(current_day)
+            builder.feed_table(table)
         
-        return result
+        return {
+            "name": self._extract_plan_name(full_text.split('\n')),
+            "workout_days": builder.finish()
+        }
     
     def _parse_table_row(self, row: List[str], order: int) -> Optional[Dict[str, Any]]:
         """Parse a table row as an exercise."""
@@ -169,9 +438,8 @@ class WorkoutPDFParser:
         
         # Skip if it looks like a note
         name_lower = name.lower()
-        for pattern in self.skip_patterns:
-            if re.search(pattern, name_lower):
-                return None
+        if self.classifier.classify(name_lower) == LineClassifier.SKIP:
+            return None
         
         # Skip if name is too short or doesn't look like an exercise
         if len(name) < 3:
@@ -185,10 +453,7 @@ class WorkoutPDFParser:
         if name.startswith('*') or name.startswith('('):
             return None
         
-        # Check if it's a valid exercise name
-        is_exercise = any(ex in name_lower for ex in self.common_exercises)
-        
-        # Also check if it has a reasonable structure (not just random text)
+        # Check if it has a reasonable structure (not just random text)
         has_alpha = bool(re.search(r'[a-zA-Z]{3,}', name))
         
         if not has_alpha:
@@ -259,44 +524,18 @@ class WorkoutPDFParser:
     
     def _extract_muscle_groups(self, text: str) -> Optional[str]:
         """Extract muscle groups from text."""
-        found = []
-        text_lower = text.lower()
-        
-        for mg in self.muscle_groups:
-            if mg in text_lower:
-                found.append(mg.title())
-        
+        found = [mg.title() for mg in self.classifier.find_muscle_groups(text.lower())]
         return ', '.join(found) if found else None
     
     def _parse_workout_text(self, text: str) -> Dict[str, Any]:
         """Parse extracted text into structured workout data (fallback)."""
-        lines = text.split('\n')
-        lines = [line.strip() for line in lines if line.strip()]
-        
-        result = {
-            "name": self._extract_plan_name(lines),
-            "workout_days": []
-        }
-        
-        # Try to find day separators
-        day_sections = self._split_into_days(lines)
-        
-        for day_num, day_lines in enumerate(day_sections, 1):
-            workout_day = self._parse_day(day_lines, day_num)
-            if workout_day["circuits"]:
-                result["workout_days"].append(workout_day)
-        
-        # If no days found, treat entire content as one day
-        if not result["workout_days"]:
-            workout_day = self._parse_day(lines, 1)
-            if workout_day["circuits"]:
-                result["workout_days"].append(workout_day)
-        
-        return result
+        builder = _TextDayBuilder(self)
+        builder.feed_text(text)
+        return builder.finish()
     
     def _extract_plan_name(self, lines: List[str]) -> str:
         """Extract the workout plan name from the first few lines."""
-        for line in lines[:10]:
+        for line in lines[:PLAN_NAME_LINES]:
             # Look for program name patterns
             if any(keyword in line.lower() for keyword in ['program', 'training', 'week', 'workout']):
                 clean = re.sub(r'[^\w\s&\-]', '', line).strip()
@@ -311,35 +550,6 @@ class WorkoutPDFParser:
         
         return "Imported Workout Plan"
     
-    def _split_into_days(self, lines: List[str]) -> List[List[str]]:
-        """Split lines into separate workout days."""
-        day_patterns = [
-            r'week\s*\d+.*day\s*\d+',
-            r'day\s*\d+',
-            r'workout\s*\d+',
-            r'session\s*\d+'
-        ]
-        
-        day_indices = [0]
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            for pattern in day_patterns:
-                if re.search(pattern, line_lower) and i > 0:
-                    if len(line) < 80:  # Header lines are usually short
-                        day_indices.append(i)
-                        break
-        
-        day_indices = sorted(set(day_indices))
-        
-        sections = []
-        for i, start_idx in enumerate(day_indices):
-            end_idx = day_indices[i + 1] if i + 1 < len(day_indices) else len(lines)
-            section = lines[start_idx:end_idx]
-            if section:
-                sections.append(section)
-        
-        return sections if sections else [lines]
-    
     def _parse_day(self, lines: List[str], day_num: int) -> Dict[str, Any]:
         """Parse a single workout day."""
         day_name = f"Day {day_num}"
@@ -347,8 +557,8 @@ class WorkoutPDFParser:
         
         for line in lines[:5]:
             line_lower = line.lower()
-            for mg in self.muscle_groups:
-                if mg in line_lower and mg.title() not in muscle_groups:
+            for mg in self.classifier.find_muscle_groups(line_lower):
+                if mg.title() not in muscle_groups:
                     muscle_groups.append(mg.title())
             
             day_match = re.search(r'(week\s*\d+.*day\s*\d+|day\s*\d+)', line_lower)
@@ -379,12 +589,8 @@ class WorkoutPDFParser:
             line_lower = line.lower()
             
             # Skip note lines
-            skip = False
-            for pattern in self.skip_patterns:
-                if re.search(pattern, line_lower):
-                    skip = True
-                    break
-            if skip:
+            kind = self.classifier.classify(line_lower)
+            if kind == LineClassifier.SKIP:
                 continue
             
             # Check for circuit header
@@ -404,7 +610,7 @@ class WorkoutPDFParser:
                 continue
             
             # Try to parse as exercise
-            exercise = self._parse_exercise_line(line, len(current_exercises) + 1)
+            exercise = self._parse_classified_line(line, len(current_exercises) + 1, kind)
             if exercise:
                 current_exercises.append(exercise)
         
@@ -420,15 +626,16 @@ class WorkoutPDFParser:
     
     def _parse_exercise_line(self, line: str, order: int) -> Optional[Dict[str, Any]]:
         """Parse a single line as an exercise."""
-        line_lower = line.lower()
-        
+        return self._parse_classified_line(line, order, self.classifier.classify(line.lower()))
+    
+    def _parse_classified_line(self, line: str, order: int, kind: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Parse a line as an exercise, given its LineClassifier result."""
         # Skip note lines
-        for pattern in self.skip_patterns:
-            if re.search(pattern, line_lower):
-                return None
+        if kind == LineClassifier.SKIP:
+            return None
         
         # Check if line contains exercise keywords
-        is_exercise = any(ex in line_lower for ex in self.common_exercises)
+        is_exercise = kind == LineClassifier.EXERCISE
         
         # Also check for common patterns
         has_sets_reps = bool(re.search(r'\d+\s*[xX×]\s*\d+|\d+\s*reps?|\d+\s*sets?', line))
@@ -508,3 +715,91 @@ class WorkoutPDFParser:
         if match:
             return int(match.group(1))
         return 3
+
+
+# ============== Parser Process ==============
+
+def _parse_in_worker(pdf_path: str, progress_conn) -> Tuple[Dict[str, Any], int]:
+    """Runs in the parser process: parse, sending (pages_done, pages_total) over progress_conn."""
+    pages = 0
+
+    def progress(pages_done: int, pages_total: int):
+        nonlocal pages
+        pages = pages_done
+        progress_conn.send((pages_done, pages_total))
+
+    try:
+        return WorkoutPDFParser().parse_pdf(pdf_path, progress=progress), pages
+    finally:
+        progress_conn.send(None)
+        progress_conn.close()
+
+
+def _lower_priority():
+    # On a small box (e.g. a Raspberry Pi) the parse shares cores with the server; let requests win
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+class ParserProcess:
+    """
+    Runs WorkoutPDFParser.parse_pdf in a long-lived worker process. Parsing is CPU-bound and,
+    on a server thread, would hold the GIL away from request handling for the whole import.
+    The process starts on the first parse and is kept for the next one; parses queue for it.
+    """
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=1, mp_context=_POOL_CONTEXT, initializer=_lower_priority
+                )
+            return self._pool
+
+    def parse_pdf(
+        self,
+        pdf_path: str,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """Same result as WorkoutPDFParser().parse_pdf. Metrics are recorded in this process."""
+        start = time.perf_counter()
+        receiver, sender = _POOL_CONTEXT.Pipe(duplex=False)
+        try:
+            pool = self._get_pool()
+            future = pool.submit(_parse_in_worker, pdf_path, sender)
+            # The worker sends None when done; polling also notices a worker that died
+            while not future.done() or receiver.poll():
+                if not receiver.poll(0.1):
+                    continue
+                message = receiver.recv()
+                if message is None:
+                    break
+                if progress:
+                    progress(*message)
+            result, pages = future.result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None  # Start a new process next time
+            pdf_parse_duration.observe(time.perf_counter() - start, "error")
+            raise Exception("PDF parser process stopped unexpectedly")
+        except Exception:
+            pdf_parse_duration.observe(time.perf_counter() - start, "error")
+            raise
+        finally:
+            receiver.close()
+            sender.close()
+
+        pdf_parse_duration.observe(time.perf_counter() - start, "ok")
+        pdf_parse_pages.observe(pages)
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
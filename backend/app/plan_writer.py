@@ -0,0 +1,86 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import models
+from .exercise_catalog import get_catalog_ids
+from .snapshots import store_plan_snapshots
+
+
+def write_plan_tree(
+    db: Session,
+    name: str,
+    workout_days: List[Dict[str, Any]],
+    description: Optional[str] = None,
+    pdf_filename: Optional[str] = None
+) -> Tuple[models.WorkoutPlan, int]:
+    """
+    Insert a plan with its days, circuits and exercises, one bulk INSERT per level, then store
+    the plan's and days' JSON snapshots.
+    workout_days uses the parser's dict layout (also what WorkoutDayCreate.model_dump() gives).
+    Nothing is committed; the caller commits the whole tree as one transaction.
+    Returns (plan, exercise count).
+    """
+    plan = models.WorkoutPlan(
+        name=name,
+        description=description,
+        pdf_filename=pdf_filename
+    )
+    db.add(plan)
+    db.flush()
+
+    day_rows = [
+        {
+            "plan_id": plan.id,
+            "name": day_data["name"],
+            "day_number": day_data["day_number"],
+            "muscle_groups": day_data.get("muscle_groups")
+        }
+        for day_data in workout_days
+    ]
+    day_ids = _insert_returning_ids(db, models.WorkoutDay, day_rows)
+
+    circuits = []
+    circuit_rows = []
+    for day_id, day_data in zip(day_ids, workout_days):
+        for circuit_data in day_data.get("circuits", []):
+            circuits.append(circuit_data)
+            circuit_rows.append({
+                "workout_day_id": day_id,
+                "circuit_number": circuit_data["circuit_number"],
+                "name": circuit_data.get("name", f"Circuit {circuit_data['circuit_number']}"),
+                "rounds": circuit_data.get("rounds", 3)
+            })
+    circuit_ids = _insert_returning_ids(db, models.Circuit, circuit_rows)
+
+    exercise_rows = []
+    for circuit_id, circuit_data in zip(circuit_ids, circuits):
+        for ex_data in circuit_data.get("exercises", []):
+            exercise_rows.append({
+                "circuit_id": circuit_id,
+                "name": ex_data["name"],
+                "order": ex_data["order"],
+                "sets": ex_data.get("sets", "3"),
+                "reps": ex_data.get("reps", "10-12"),
+                "weight_recommendation": ex_data.get("weight_recommendation"),
+                "notes": ex_data.get("notes")
+            })
+    if exercise_rows:
+        catalog_ids = get_catalog_ids(db, [row["name"] for row in exercise_rows])
+        for row in exercise_rows:
+            row["catalog_id"] = catalog_ids[row["name"]]
+        # executemany; exercise ids are not needed
+        db.execute(insert(models.Exercise), exercise_rows)
+
+    store_plan_snapshots(db, plan.id)
+    return plan, len(exercise_rows)
+
+
+def _insert_returning_ids(db: Session, model, rows: List[Dict[str, Any]]) -> List[int]:
+    """Bulk insert rows and return their new ids, in the same order as rows."""
+    if not rows:
+        return []
+    # Not sort_by_parameter_order: SQLite can only honour it one row at a time. Multi-row
+    # INSERTs assign ascending ids in parameter order, so sorting the ids gives the same result.
+    stmt = insert(model).returning(model.id)
+    return sorted(db.scalars(stmt, rows))
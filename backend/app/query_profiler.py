@@ -0,0 +1,145 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Per-request query counts and DB time in a Server-Timing header and the debug log
+QUERY_PROFILING = os.getenv("QUERY_PROFILING", "1") == "1"
+# A statement issued this many times in one request is reported as a likely N+1
+REPEATED_QUERY_THRESHOLD = int(os.getenv("REPEATED_QUERY_THRESHOLD", "3"))
+
+# "IN (?, ?, ?)" and multi-row VALUES differ by batch size, not by query shape
+_PLACEHOLDER_LIST_RE = re.compile(r"\?(?:,\s*\?)+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Statement text with placeholder lists collapsed, so calls differing only in parameters match."""
+    return _PLACEHOLDER_LIST_RE.sub("?", _WHITESPACE_RE.sub(" ", statement).strip())
+
+
+class QueryProfile:
+    """SQL statements issued while this profile is active, with their total database time."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.db_seconds += seconds
+        self.statements[normalize_statement(statement)] += 1
+
+    def repeated(self, threshold: int = REPEATED_QUERY_THRESHOLD) -> Dict[str, int]:
+        """Statements issued at least threshold times: likely lazy loads inside a loop (N+1)."""
+        return {statement: n for statement, n in self.statements.items() if n >= threshold}
+
+    def server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """Server-Timing header value: DB time and query count, plus total time if given."""
+        parts = [f'db;dur={self.db_seconds * 1000:.2f};desc="{self.count} queries"']
+        repeated = self.repeated()
+        if repeated:
+            parts.append(f'n1;desc="{len(repeated)} repeated statements"')
+        if total_seconds is not None:
+            parts.append(f"app;dur={total_seconds * 1000:.2f}")
+        return ", ".join(parts)
+
+
+# Profiles active in this context, outermost first; a statement is recorded in each of them
+_active_profiles: ContextVar[Tuple[QueryProfile, ...]] = ContextVar("query_profiles", default=())
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _active_profiles.get():
+        context._query_profile_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_profile_start", None)
+    if start is None:
+        return
+    seconds = time.perf_counter() - start
+    for profile in _active_profiles.get():
+        profile.record(statement, seconds)
+
+
+@contextmanager
+def profile_queries():
+    """
+    Profile the SQL issued inside the block, in this context: the current task or thread, and
+    the threads FastAPI runs sync routes in (they copy the context).
+    """
+    profile = QueryProfile()
+    token = _active_profiles.set((*_active_profiles.get(), profile))
+    try:
+        yield profile
+    finally:
+        _active_profiles.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int, allow_repeated: bool = False):
+    """
+    Fail if the block issues more than max_queries statements, or repeats one (N+1) unless
+    allow_repeated. Meant for tests; tests/conftest.py provides it as the query_budget fixture:
+
+        def test_get_plan(client, query_budget):
+            with query_budget(1):
+                client.get("/api/plans/1")
+    """
+    with profile_queries() as profile:
+        yield profile
+    problems: List[str] = []
+    if profile.count > max_queries:
+        problems.append(f"{profile.count} queries, budget {max_queries}")
+    if not allow_repeated:
+        problems += [f"{n}x {statement}" for statement, n in profile.repeated().items()]
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems))
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware profiling each request's SQL. Adds a Server-Timing header (shown in the
+    browser devtools' network timing) and logs the counts, and any repeated statements, at DEBUG.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_PROFILING:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        with profile_queries() as profile:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    header = profile.server_timing(time.perf_counter() - start)
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{scope['method']} {scope['path']}: {profile.count} queries, "
+                         f"{profile.db_seconds * 1000:.2f} ms in the database")
+            for statement, n in profile.repeated().items():
+                logger.debug(f"Repeated {n}x (N+1?): {statement}")
@@ -0,0 +1,126 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Most serialized responses kept in memory, and their total size; 0 entries turns caching off
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Session.info key holding the resources a transaction changed
+_INVALIDATED = "invalidated_resources"
+
+
+class ResponseCache:
+    """
+    In-process LRU of serialized GET responses, keyed by resource version.
+    A write bumps the version of each resource it changes, so entries for older versions are
+    never read again and simply age out. ETags are built from the same versions, plus an id for
+    this process so they do not survive a restart. Versions live in this process: run one worker.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.boot_id = uuid.uuid4().hex[:8]
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def etag(self, resource: str) -> str:
+        """Strong ETag for the resource's current version."""
+        with self._lock:
+            version = self._versions.get(resource, 0)
+        return f'"{self.boot_id}-{resource}-{version}"'
+
+    def bump(self, *resources: str):
+        """Give resources a new version, invalidating their ETags and cached responses."""
+        with self._lock:
+            for resource in resources:
+                self._versions[resource] = self._versions.get(resource, 0) + 1
+
+    def matches(self, etag: str, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header names etag; counts the 304 it allows."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        matched = etag in tags or "*" in tags
+        if matched:
+            with self._lock:
+                self.not_modified += 1
+        return matched
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return a cached response body, or None on a miss."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return body
+
+    def put(self, key: Hashable, body: bytes):
+        """Store a response body, evicting least recently used entries past either limit."""
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def invalidate(db: Session, *resources: str):
+    """
+    Mark resources as changed by db's transaction. Their versions are bumped once it commits:
+    bumping earlier would let a concurrent reader cache the old rows under the new version.
+    """
+    db.info.setdefault(_INVALIDATED, set()).update(resources)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(db: Session):
+    resources = db.info.pop(_INVALIDATED, None)
+    if resources:
+        response_cache.bump(*resources)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(db: Session):
+    db.info.pop(_INVALIDATED, None)
@@ -0,0 +1,141 @@
+import argparse
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("sessions", "sets", "reps", "tonnage", "minutes")
+
+# Total rows use this in place of a muscle group
+ALL_GROUPS = ""
+
+
+def parse_muscle_groups(muscle_groups: Optional[str]) -> List[str]:
+    """Split WorkoutDay.muscle_groups ("Chest, Back") into its groups."""
+    if not muscle_groups:
+        return []
+    return [group.strip() for group in muscle_groups.split(",") if group.strip()]
+
+
+def _periods(day: date) -> Tuple[Tuple[str, date], ...]:
+    return ("day", day), ("week", day - timedelta(days=day.weekday()))
+
+
+class RollupDelta:
+    """
+    Changes to rollup rows, accumulated in memory and written with one upsert.
+    Routes apply it in the same transaction as the logs and sessions it describes.
+    """
+
+    def __init__(self):
+        self.rows: Dict[Tuple[str, date, str], Dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys(METRICS, 0)
+        )
+
+    def _add(self, when: datetime, muscle_groups: Optional[str], sign: int, **metrics):
+        for period, start in _periods(when.date()):
+            for group in (ALL_GROUPS, *parse_muscle_groups(muscle_groups)):
+                row = self.rows[(period, start, group)]
+                for name, value in metrics.items():
+                    row[name] += sign * value
+
+    def add_log(self, log: models.ExerciseLog, muscle_groups: Optional[str], sign: int = 1):
+        """Count one logged set. log can be an ExerciseLog or a row with the same columns."""
+        reps = log.reps_completed or 0
+        self._add(
+            log.logged_at, muscle_groups, sign,
+            sets=1, reps=reps, tonnage=(log.weight_used or 0) * reps
+        )
+
+    def add_session(self, completed_at: Optional[datetime], duration_minutes: Optional[int],
+                    muscle_groups: Optional[str], sign: int = 1):
+        """Count a completed session; sessions without completed_at do not count."""
+        if completed_at:
+            self._add(completed_at, muscle_groups, sign, sessions=1, minutes=duration_minutes or 0)
+
+    def apply(self, db: Session):
+        """Add the accumulated changes to the rollup rows, creating missing rows."""
+        params = [
+            {"period": period, "period_start": start, "muscle_group": group, **values}
+            for (period, start, group), values in self.rows.items()
+            if any(values.values())
+        ]
+        if not params:
+            return
+        stmt = sqlite_insert(models.TrainingRollup)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["period", "period_start", "muscle_group"],
+                set_={
+                    name: getattr(models.TrainingRollup, name) + getattr(stmt.excluded, name)
+                    for name in METRICS
+                }
+            ),
+            params
+        )
+        self.rows.clear()
+
+
+def rebuild_rollups(db: Session):
+    """Recompute all rollup rows from sessions and logs. The caller commits."""
+    db.execute(delete(models.TrainingRollup))
+    delta = RollupDelta()
+
+    sessions = db.execute(
+        select(
+            models.WorkoutSession.completed_at,
+            models.WorkoutSession.duration_minutes,
+            models.WorkoutDay.muscle_groups
+        )
+        .outerjoin(models.WorkoutDay, models.WorkoutDay.id == models.WorkoutSession.workout_day_id)
+        .where(models.WorkoutSession.completed_at.isnot(None))
+        .execution_options(yield_per=1000)
+    )
+    for completed_at, duration_minutes, muscle_groups in sessions:
+        delta.add_session(completed_at, duration_minutes, muscle_groups)
+
+    logs = db.execute(
+        select(
+            models.ExerciseLog.logged_at,
+            models.ExerciseLog.reps_completed,
+            models.ExerciseLog.weight_used,
+            models.WorkoutDay.muscle_groups
+        )
+        .join(models.WorkoutSession, models.WorkoutSession.id == models.ExerciseLog.session_id)
+        .outerjoin(models.WorkoutDay, models.WorkoutDay.id == models.WorkoutSession.workout_day_id)
+        .execution_options(yield_per=1000)
+    )
+    for log in logs:
+        delta.add_log(log, log.muscle_groups)
+
+    delta.apply(db)
+
+
+def main():
+    """Command line: python -m app.rollups rebuild"""
+    arg_parser = argparse.ArgumentParser(description="Maintain training rollup tables.")
+    arg_parser.add_argument("command", choices=["rebuild"])
+    arg_parser.parse_args()
+
+    from .database import SessionLocal, engine
+    from .migrations import run_migrations
+
+    logging.basicConfig(level=logging.INFO)
+    run_migrations(engine)
+    with SessionLocal() as db:
+        rebuild_rollups(db)
+        db.commit()
+        rows = db.query(models.TrainingRollup).count()
+    logger.info(f"Rebuilt training rollups: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
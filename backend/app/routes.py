@@ -1,45 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import func, distinct, select, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Union
 import os
-import shutil
-from datetime import datetime, timedelta
+import base64
+import hashlib
+import tempfile
+from datetime import date, datetime, timedelta
 
 from . import models, schemas
-from .database import get_db
-from .pdf_parser import WorkoutPDFParser
+from .change_tracking import next_change_seq
+from .rollups import ALL_GROUPS, RollupDelta
+from .database import get_db, get_async_db, SessionLocal
+from .jobs import Job, JobQueue
+from .parse_cache import ParseCache
+from .pdf_parser import ParserProcess, PARSER_VERSION
+from .response_cache import invalidate, response_cache
+from .snapshots import day_snapshot, plan_snapshot
+from .plan_writer import write_plan_tree
+from .uploads import UPLOAD_DIR, stored_filename
 
-router = APIRouter()
+router = APIRouter(prefix="/api")
 
-UPLOAD_DIR = "./data/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+MAX_SESSIONS_PAGE_SIZE = 200
+
+MAX_LOG_BATCH_SIZE = 500
+
+# Background workers for PDF imports
+job_queue = JobQueue()
+
+# Parser output keyed by uploaded file content
+parse_cache = ParseCache()
+
+# Parses run in their own process, so an import doesn't slow down requests
+parser_process = ParserProcess()
+
+
+# ============== Response Cache ==============
+
+_PLAN_SUMMARIES = TypeAdapter(List[schemas.WorkoutPlanSummary])
+_DAY_SUMMARIES = TypeAdapter(List[schemas.WorkoutDaySummary])
+_SESSION = TypeAdapter(schemas.WorkoutSession)
+
+
+def _json_response(body: bytes, etag: str) -> Response:
+    # no-cache: clients keep the body but revalidate with If-None-Match every time
+    return Response(body, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _cache_lookup(resource: str, key: tuple, if_none_match: Optional[str]):
+    """
+    Answer a GET without touching the database: 304 when the client's copy is current, else the
+    cached body for the resource's current version. Returns (response or None, cache key, ETag).
+    """
+    etag = response_cache.etag(resource)
+    if response_cache.matches(etag, if_none_match):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}), None, etag
+    key = (*key, etag)
+    body = response_cache.get(key)
+    return (_json_response(body, etag) if body is not None else None), key, etag
+
+
+def _cache_store(key: tuple, etag: str, body: bytes) -> Response:
+    """Cache a response body and return it."""
+    response_cache.put(key, body)
+    return _json_response(body, etag)
+
+
+def _dump(adapter: TypeAdapter, value) -> bytes:
+    """Serialize value (ORM objects included) through its response schema."""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+@router.get("/response-cache/stats", response_model=schemas.ResponseCacheStats)
+def get_response_cache_stats():
+    """Get response cache hit rate and memory use."""
+    return response_cache.stats()
 
 
 # ============== Workout Plans ==============
 
 @router.get("/plans", response_model=List[schemas.WorkoutPlanSummary])
-def get_workout_plans(db: Session = Depends(get_db)):
+def get_workout_plans(if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     """Get all workout plans with summary info."""
-    plans = db.query(models.WorkoutPlan).all()
+    cached, key, etag = _cache_lookup("plans", ("plans",), if_none_match)
+    if cached:
+        return cached
+    
+    # Count days in SQL rather than loading every plan's days
+    rows = db.query(
+        models.WorkoutPlan,
+        func.count(models.WorkoutDay.id)
+    ).outerjoin(models.WorkoutPlan.workout_days).group_by(models.WorkoutPlan.id).all()
+    
     result = []
-    for plan in plans:
+    for plan, day_count in rows:
         result.append(schemas.WorkoutPlanSummary(
             id=plan.id,
             name=plan.name,
             description=plan.description,
             created_at=plan.created_at,
-            day_count=len(plan.workout_days)
+            day_count=day_count
         ))
-    return result
+    return _cache_store(key, etag, _dump(_PLAN_SUMMARIES, result))
 
 
 @router.get("/plans/{plan_id}", response_model=schemas.WorkoutPlan)
-def get_workout_plan(plan_id: int, db: Session = Depends(get_db)):
+def get_workout_plan(plan_id: int, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     """Get a specific workout plan with all details."""
-    plan = db.query(models.WorkoutPlan).filter(models.WorkoutPlan.id == plan_id).first()
-    if not plan:
+    cached, key, etag = _cache_lookup("plans", ("plan", plan_id), if_none_match)
+    if cached:
+        return cached
+    
+    # The JSON stored when the plan was written; no ORM tree to load and validate
+    body = plan_snapshot(db, plan_id)
+    if body is None:
         raise HTTPException(status_code=404, detail="Workout plan not found")
-    return plan
+    return _cache_store(key, etag, body)
 
 
 @router.delete("/plans/{plan_id}")
@@ -50,104 +134,135 @@ def delete_workout_plan(plan_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Workout plan not found")
     
     db.delete(plan)
+    invalidate(db, "plans")
     db.commit()
     return {"message": "Workout plan deleted successfully"}
 
 
-@router.post("/plans/upload", response_model=schemas.PDFUploadResponse)
+@router.post("/plans/upload", response_model=schemas.UploadJobStatus, status_code=202)
 async def upload_workout_pdf(
     file: UploadFile = File(...),
-    plan_name: str = Form(None),
-    db: Session = Depends(get_db)
+    plan_name: str = Form(None)
 ):
-    """Upload and parse a workout PDF file."""
+    """Upload a workout PDF and queue it for parsing. Poll /api/jobs/{id} for the result."""
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
-    # Save uploaded file
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Save uploaded file under its content hash, hashing as it streams in. Hashing, disk
+    # writes and the rename run on the threadpool so the event loop keeps serving requests.
+    digest = hashlib.sha256()
+    buffer = await run_in_threadpool(
+        tempfile.NamedTemporaryFile, dir=UPLOAD_DIR, suffix=".part", delete=False
+    )
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await run_in_threadpool(_write_upload_chunk, buffer, digest, chunk)
+    finally:
+        await run_in_threadpool(buffer.close)
+    
+    content_hash = digest.hexdigest()
+    file_path = await run_in_threadpool(_store_upload, buffer.name, content_hash)
     
+    job = job_queue.submit(_import_workout_pdf, file_path, content_hash, plan_name)
+    return job
+
+
+def _write_upload_chunk(buffer, digest, chunk: bytes):
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+def _store_upload(temp_path: str, content_hash: str) -> str:
+    """Move a finished upload to its content-hash name. Returns the stored file's path."""
+    file_path = os.path.join(UPLOAD_DIR, stored_filename(content_hash))
+    if os.path.exists(file_path):
+        os.remove(temp_path)  # Same content already stored
+        os.utime(file_path)  # Fresh mtime keeps the upload sweeper off it until the import is done
+    else:
+        os.replace(temp_path, file_path)
+    return file_path
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.UploadJobStatus)
+def get_job(job_id: str):
+    """Get the state and progress of a background PDF import."""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/parse-cache/stats", response_model=schemas.ParseCacheStats)
+def get_parse_cache_stats():
+    """Get parse cache hit/miss counters."""
+    return parse_cache.stats()
+
+
+def _import_workout_pdf(job: Job, file_path: str, content_hash: str, plan_name: str = None):
+    """
+    Parse a saved PDF (or reuse cached output) and create its workout plan. Runs on the job
+    queue; the parse itself happens in the parser process, only the database write here.
+    """
+    db = SessionLocal()
     try:
-        # Parse PDF
-        parser = WorkoutPDFParser()
-        parsed_data = parser.parse_pdf(file_path)
+        parsed_data = parse_cache.get(content_hash, PARSER_VERSION)
+        cache_hit = parsed_data is not None
+        if not cache_hit:
+            try:
+                parsed_data = parser_process.parse_pdf(file_path, progress=job.set_progress)
+            except Exception as e:
+                raise Exception(f"Error parsing PDF: {str(e)}")
+            parse_cache.put(content_hash, PARSER_VERSION, parsed_data)
         
-        # Create workout plan
-        plan = models.WorkoutPlan(
+        plan, total_exercises = write_plan_tree(
+            db,
             name=plan_name or parsed_data.get("name", "Imported Workout"),
-            pdf_filename=file.filename
+            workout_days=parsed_data.get("workout_days", []),
+            pdf_filename=os.path.basename(file_path)
         )
-        db.add(plan)
-        db.flush()
-        
-        total_exercises = 0
-        
-        # Create workout days
-        for day_data in parsed_data.get("workout_days", []):
-            workout_day = models.WorkoutDay(
-                plan_id=plan.id,
-                name=day_data["name"],
-                day_number=day_data["day_number"],
-                muscle_groups=day_data.get("muscle_groups")
-            )
-            db.add(workout_day)
-            db.flush()
-            
-            # Create circuits
-            for circuit_data in day_data.get("circuits", []):
-                circuit = models.Circuit(
-                    workout_day_id=workout_day.id,
-                    circuit_number=circuit_data["circuit_number"],
-                    name=circuit_data.get("name", f"Circuit {circuit_data['circuit_number']}"),
-                    rounds=circuit_data.get("rounds", 3)
-                )
-                db.add(circuit)
-                db.flush()
-                
-                # Create exercises
-                for ex_data in circuit_data.get("exercises", []):
-                    exercise = models.Exercise(
-                        circuit_id=circuit.id,
-                        name=ex_data["name"],
-                        order=ex_data["order"],
-                        sets=ex_data.get("sets", "3"),
-                        reps=ex_data.get("reps", "10-12"),
-                        weight_recommendation=ex_data.get("weight_recommendation"),
-                        notes=ex_data.get("notes")
-                    )
-                    db.add(exercise)
-                    total_exercises += 1
-        
+        invalidate(db, "plans")
         db.commit()
         
-        return schemas.PDFUploadResponse(
-            success=True,
-            message=f"Successfully imported workout plan: {plan.name}",
-            plan_id=plan.id,
-            workout_days_count=len(parsed_data.get("workout_days", [])),
-            exercises_count=total_exercises
-        )
-        
-    except Exception as e:
+        return {
+            "plan_id": plan.id,
+            "message": f"Successfully imported workout plan: {plan.name}",
+            "workout_days_count": len(parsed_data.get("workout_days", [])),
+            "exercises_count": total_exercises,
+            "cache_hit": cache_hit
+        }
+    except Exception:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error parsing PDF: {str(e)}")
+        raise
+    finally:
+        db.close()
 
 
 # ============== Workout Days ==============
 
 @router.get("/days", response_model=List[schemas.WorkoutDaySummary])
-def get_workout_days(plan_id: int = None, db: Session = Depends(get_db)):
+def get_workout_days(
+    plan_id: int = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get all workout days, optionally filtered by plan."""
-    query = db.query(models.WorkoutDay)
+    # Days only change with their plan, so they share its version
+    cached, key, etag = _cache_lookup("plans", ("days", plan_id), if_none_match)
+    if cached:
+        return cached
+    
+    # Count circuits and exercises in SQL rather than loading each day's tree
+    query = db.query(
+        models.WorkoutDay,
+        func.count(distinct(models.Circuit.id)),
+        func.count(models.Exercise.id)
+    ).outerjoin(models.WorkoutDay.circuits).outerjoin(models.Circuit.exercises)
     if plan_id:
         query = query.filter(models.WorkoutDay.plan_id == plan_id)
     
-    days = query.all()
+    rows = query.group_by(models.WorkoutDay.id).all()
     result = []
-    for day in days:
-        exercise_count = sum(len(c.exercises) for c in day.circuits)
+    for day, circuit_count, exercise_count in rows:
         result.append(schemas.WorkoutDaySummary(
             id=day.id,
             plan_id=day.plan_id,
@@ -155,63 +270,158 @@ def get_workout_days(plan_id: int = None, db: Session = Depends(get_db)):
             day_number=day.day_number,
             muscle_groups=day.muscle_groups,
             exercise_count=exercise_count,
-            circuit_count=len(day.circuits)
+            circuit_count=circuit_count
         ))
-    return result
+    return _cache_store(key, etag, _dump(_DAY_SUMMARIES, result))
 
 
 @router.get("/days/{day_id}", response_model=schemas.WorkoutDay)
-def get_workout_day(day_id: int, db: Session = Depends(get_db)):
+async def get_workout_day(
+    day_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get a specific workout day with all circuits and exercises."""
-    day = db.query(models.WorkoutDay).filter(models.WorkoutDay.id == day_id).first()
-    if not day:
+    cached, key, etag = _cache_lookup("plans", ("day", day_id), if_none_match)
+    if cached:
+        return cached
+    
+    body = await db.run_sync(day_snapshot, day_id)
+    if body is None:
         raise HTTPException(status_code=404, detail="Workout day not found")
-    return day
+    return _cache_store(key, etag, body)
 
 
 # ============== Workout Sessions ==============
 
 @router.post("/sessions", response_model=schemas.WorkoutSession)
-def start_workout_session(
+async def start_workout_session(
     session_data: schemas.WorkoutSessionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Start a new workout session."""
+    """Start a new workout session. A retried request with the same idempotency_key returns the first session."""
+    if session_data.idempotency_key:
+        existing = await _get_session_by_key(db, session_data.idempotency_key)
+        if existing:
+            return existing
+    
     # Verify workout day exists
-    day = db.query(models.WorkoutDay).filter(
-        models.WorkoutDay.id == session_data.workout_day_id
-    ).first()
-    if not day:
+    day_id = await db.scalar(
+        select(models.WorkoutDay.id).where(models.WorkoutDay.id == session_data.workout_day_id)
+    )
+    if day_id is None:
         raise HTTPException(status_code=404, detail="Workout day not found")
     
     session = models.WorkoutSession(
         workout_day_id=session_data.workout_day_id,
-        notes=session_data.notes
+        notes=session_data.notes,
+        idempotency_key=session_data.idempotency_key,
+        exercise_logs=[]  # New session: nothing to lazy-load when serializing
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key committed first; without a key there is no
+        # original to return (a NULL key lookup would match any unkeyed session)
+        await db.rollback()
+        if not session_data.idempotency_key:
+            raise
+        existing = await _get_session_by_key(db, session_data.idempotency_key)
+        if not existing:
+            raise
+        return existing
     return session
 
 
-@router.get("/sessions", response_model=List[schemas.WorkoutSession])
-def get_all_sessions(db: Session = Depends(get_db)):
-    """Get all workout sessions, ordered by most recent."""
-    sessions = db.query(models.WorkoutSession).order_by(
-        models.WorkoutSession.started_at.desc()
-    ).limit(50).all()
-    return sessions
+async def _get_session_by_key(db: AsyncSession, idempotency_key: str):
+    return (await db.scalars(
+        select(models.WorkoutSession)
+        .options(selectinload(models.WorkoutSession.exercise_logs))
+        .where(models.WorkoutSession.idempotency_key == idempotency_key)
+    )).first()
+
+
+@router.get(
+    "/sessions",
+    response_model=List[Union[schemas.WorkoutSession, schemas.WorkoutSessionSummary]]
+)
+def get_all_sessions(
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_SESSIONS_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_logs: bool = True,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get workout sessions, ordered by most recent, one page at a time.
+    When there are more, the X-Next-Cursor response header holds the cursor for the next page.
+    With include_logs=false, sessions are returned without their exercise logs.
+    """
+    query = db.query(models.WorkoutSession)
+    if from_date:
+        query = query.filter(models.WorkoutSession.started_at >= from_date)
+    if to_date:
+        query = query.filter(models.WorkoutSession.started_at < to_date)
+    if cursor:
+        # Keyset pagination: continue right after the last (started_at, id) already returned
+        last_started_at, last_id = _decode_sessions_cursor(cursor)
+        query = query.filter(
+            models.WorkoutSession.started_at <= last_started_at,
+            or_(
+                models.WorkoutSession.started_at < last_started_at,
+                models.WorkoutSession.id < last_id
+            )
+        )
+    if include_logs:
+        # All logs for the page in one query
+        query = query.options(selectinload(models.WorkoutSession.exercise_logs))
+    
+    sessions = query.order_by(
+        models.WorkoutSession.started_at.desc(),
+        models.WorkoutSession.id.desc()
+    ).limit(limit + 1).all()
+    
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        response.headers["X-Next-Cursor"] = _encode_sessions_cursor(sessions[-1])
+    
+    schema = schemas.WorkoutSession if include_logs else schemas.WorkoutSessionSummary
+    return [schema.model_validate(session) for session in sessions]
+
+
+def _encode_sessions_cursor(session: models.WorkoutSession) -> str:
+    raw = f"{session.started_at.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_sessions_cursor(cursor: str):
+    try:
+        started_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(started_at), int(session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.get("/sessions/{session_id}", response_model=schemas.WorkoutSession)
-def get_workout_session(session_id: int, db: Session = Depends(get_db)):
+def get_workout_session(
+    session_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get a specific workout session."""
+    cached, key, etag = _cache_lookup(f"session:{session_id}", ("session", session_id), if_none_match)
+    if cached:
+        return cached
+    
     session = db.query(models.WorkoutSession).filter(
         models.WorkoutSession.id == session_id
     ).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+    return _cache_store(key, etag, _dump(_SESSION, session))
 
 
 @router.delete("/sessions/{session_id}")
@@ -223,49 +433,75 @@ def delete_workout_session(session_id: int, db: Session = Depends(get_db)):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    # Take the session and its sets back out of the training rollups
+    muscle_groups = db.scalar(
+        select(models.WorkoutDay.muscle_groups).where(models.WorkoutDay.id == session.workout_day_id)
+    )
+    delta = RollupDelta()
+    delta.add_session(session.completed_at, session.duration_minutes, muscle_groups, sign=-1)
+    for log in session.exercise_logs:
+        delta.add_log(log, muscle_groups, sign=-1)
+    delta.apply(db)
+    
     db.delete(session)
+    invalidate(db, f"session:{session_id}")
     db.commit()
     return {"message": "Session deleted successfully"}
 
 
 @router.patch("/sessions/{session_id}", response_model=schemas.WorkoutSession)
-def update_workout_session(
+async def update_workout_session(
     session_id: int,
     update_data: schemas.WorkoutSessionUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a workout session (e.g., mark as completed)."""
-    session = db.query(models.WorkoutSession).filter(
-        models.WorkoutSession.id == session_id
-    ).first()
+    session = (await db.scalars(
+        select(models.WorkoutSession)
+        .options(selectinload(models.WorkoutSession.exercise_logs))
+        .where(models.WorkoutSession.id == session_id)
+    )).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    delta = RollupDelta()
+    muscle_groups = await db.scalar(
+        select(models.WorkoutDay.muscle_groups).where(models.WorkoutDay.id == session.workout_day_id)
+    )
+    delta.add_session(session.completed_at, session.duration_minutes, muscle_groups, sign=-1)
+    
     if update_data.completed_at:
         session.completed_at = update_data.completed_at
-        # Update user stats
-        _update_user_stats(db, session)
     if update_data.duration_minutes is not None:
         session.duration_minutes = update_data.duration_minutes
     if update_data.notes is not None:
         session.notes = update_data.notes
     
-    db.commit()
-    db.refresh(session)
+    delta.add_session(session.completed_at, session.duration_minutes, muscle_groups)
+    await db.run_sync(delta.apply)
+    invalidate(db, f"session:{session_id}")
+    if update_data.completed_at:
+        # Update user stats (after duration_minutes is set, so it counts towards total minutes)
+        await db.run_sync(_update_user_stats, session)
+    
+    await db.commit()
     return session
 
 
 @router.post("/sessions/{session_id}/log", response_model=schemas.ExerciseLog)
-def log_exercise(
+async def log_exercise(
     session_id: int,
     log_data: schemas.ExerciseLogCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Log an exercise completion in a session."""
-    session = db.query(models.WorkoutSession).filter(
-        models.WorkoutSession.id == session_id
-    ).first()
-    if not session:
+    """Log an exercise completion in a session. A retried request with the same idempotency_key returns the first log."""
+    if log_data.idempotency_key:
+        existing = await _get_log_by_key(db, session_id, log_data.idempotency_key)
+        if existing:
+            return existing
+    
+    found = (await db.execute(_session_muscle_groups(session_id))).first()
+    if found is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
     log = models.ExerciseLog(
@@ -274,14 +510,153 @@ def log_exercise(
         set_number=log_data.set_number,
         reps_completed=log_data.reps_completed,
         weight_used=log_data.weight_used,
-        completed=log_data.completed
+        completed=log_data.completed,
+        idempotency_key=log_data.idempotency_key
     )
     db.add(log)
-    db.commit()
-    db.refresh(log)
+    try:
+        # The flush runs the INSERT, so a duplicate key is raised here rather than at commit
+        await db.flush()
+        delta = RollupDelta()
+        delta.add_log(log, found.muscle_groups)
+        await db.run_sync(delta.apply)
+        invalidate(db, f"session:{session_id}")
+        await db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key committed first; without a key there is no
+        # original to return (a NULL key lookup would match any unkeyed log)
+        await db.rollback()
+        if not log_data.idempotency_key:
+            raise
+        existing = await _get_log_by_key(db, session_id, log_data.idempotency_key)
+        if not existing:
+            raise HTTPException(status_code=409, detail="idempotency_key already used in another session")
+        return existing
     return log
 
 
+def _session_muscle_groups(session_id: int):
+    """Select a session's id and its workout day's muscle groups, for rollup updates."""
+    return (
+        select(models.WorkoutSession.id, models.WorkoutDay.muscle_groups)
+        .outerjoin(models.WorkoutDay, models.WorkoutDay.id == models.WorkoutSession.workout_day_id)
+        .where(models.WorkoutSession.id == session_id)
+    )
+
+
+async def _get_log_by_key(db: AsyncSession, session_id: int, idempotency_key: str):
+    """The session's log with this key; a key used in another session is not a replay."""
+    return await db.scalar(
+        select(models.ExerciseLog).where(
+            models.ExerciseLog.idempotency_key == idempotency_key,
+            models.ExerciseLog.session_id == session_id
+        )
+    )
+
+
+@router.post("/sessions/{session_id}/logs", response_model=List[schemas.ExerciseLog])
+async def log_exercises(
+    session_id: int,
+    logs_data: List[schemas.ExerciseLogCreate],
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Log several sets in a session at once, in a single transaction.
+    Logs whose idempotency_key was already used are not inserted again; the original is returned.
+    """
+    if len(logs_data) > MAX_LOG_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_LOG_BATCH_SIZE} logs per request"
+        )
+    
+    found = (await db.execute(_session_muscle_groups(session_id))).first()
+    if found is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if not logs_data:
+        return []
+    
+    # Check every referenced exercise exists with one query
+    exercise_ids = {log_data.exercise_id for log_data in logs_data}
+    existing = set(await db.scalars(
+        select(models.Exercise.id).where(models.Exercise.id.in_(exercise_ids))
+    ))
+    missing = sorted(exercise_ids - existing)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Exercises not found: {missing}")
+    
+    # One multi-row INSERT ... RETURNING for the whole batch. Not sort_by_parameter_order,
+    # which SQLite can only honour one row at a time; ids follow the input order instead.
+    # Bulk inserts skip the flush hook, so change_seq is set here.
+    change_seq = await db.run_sync(next_change_seq)
+    inserted = await db.scalars(
+        sqlite_insert(models.ExerciseLog)
+        .on_conflict_do_nothing(index_elements=["idempotency_key"])
+        .returning(models.ExerciseLog),
+        [
+            {"session_id": session_id, "change_seq": change_seq, **log_data.model_dump()}
+            for log_data in logs_data
+        ]
+    )
+    inserted = sorted(inserted, key=lambda log: log.id)
+    
+    # Keyed logs (new or already stored) are looked up by key, the rest taken in insert order
+    keys = [log_data.idempotency_key for log_data in logs_data if log_data.idempotency_key]
+    logs_by_key = {}
+    if keys:
+        logs_by_key = {log.idempotency_key: log for log in await db.scalars(
+            select(models.ExerciseLog).where(models.ExerciseLog.idempotency_key.in_(keys))
+        )}
+    unkeyed = iter(log for log in inserted if log.idempotency_key is None)
+    logs = [
+        logs_by_key[log_data.idempotency_key] if log_data.idempotency_key else next(unkeyed)
+        for log_data in logs_data
+    ]
+    
+    # Only newly inserted sets count towards the rollups
+    delta = RollupDelta()
+    for log in inserted:
+        delta.add_log(log, found.muscle_groups)
+    await db.run_sync(delta.apply)
+    invalidate(db, f"session:{session_id}")
+    await db.commit()
+    return logs
+
+
+# ============== Delta Sync ==============
+
+@router.get("/sync", response_model=schemas.SyncResponse)
+def sync_changes(since: int = Query(0, ge=0), db: Session = Depends(get_db)):
+    """
+    Sessions and logs created or changed, and ids deleted, since a previous sync's cursor.
+    Start with since=0 and pass the returned cursor next time.
+    """
+    # Read the cursor first; anything committed after it has a higher change_seq and is
+    # left for the next sync
+    cursor = db.scalar(select(models.ChangeCounter.value).where(models.ChangeCounter.id == 1)) or 0
+    
+    def changed(model):
+        return select(model).where(
+            model.change_seq > since, model.change_seq <= cursor
+        ).order_by(model.change_seq, model.id)
+    
+    sessions = db.scalars(changed(models.WorkoutSession)).all()
+    logs = db.scalars(changed(models.ExerciseLog)).all()
+    
+    deleted = schemas.SyncDeleted()
+    for record in db.scalars(changed(models.DeletedRecord)):
+        if record.table_name == models.WorkoutSession.__tablename__:
+            deleted.sessions.append(record.record_id)
+        elif record.table_name == models.ExerciseLog.__tablename__:
+            deleted.exercise_logs.append(record.record_id)
+    
+    return schemas.SyncResponse(
+        cursor=cursor,
+        sessions=[schemas.SyncWorkoutSession.model_validate(session) for session in sessions],
+        exercise_logs=[schemas.SyncExerciseLog.model_validate(log) for log in logs],
+        deleted=deleted
+    )
+
+
 # ============== User Stats ==============
 
 @router.get("/stats", response_model=schemas.UserStatsResponse)
@@ -296,12 +671,38 @@ def get_user_stats(db: Session = Depends(get_db)):
     return stats
 
 
+@router.get("/stats/rollups", response_model=List[schemas.TrainingRollup])
+def get_training_rollups(
+    period: str = Query("week", pattern="^(day|week)$"),
+    by_muscle_group: bool = False,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Per-day or per-ISO-week training totals (sessions, sets, reps, tonnage, minutes), oldest first.
+    With by_muscle_group=true, one row per muscle group and period instead of overall totals.
+    """
+    rollup = models.TrainingRollup
+    query = select(rollup).where(rollup.period == period)
+    if by_muscle_group:
+        query = query.where(rollup.muscle_group != ALL_GROUPS)
+    else:
+        query = query.where(rollup.muscle_group == ALL_GROUPS)
+    if from_date:
+        query = query.where(rollup.period_start >= from_date)
+    if to_date:
+        query = query.where(rollup.period_start < to_date)
+    return db.scalars(query.order_by(rollup.period_start, rollup.muscle_group)).all()
+
+
 def _update_user_stats(db: Session, session: models.WorkoutSession):
     """Update user stats after completing a workout."""
     stats = db.query(models.UserStats).first()
     if not stats:
         stats = models.UserStats()
         db.add(stats)
+        db.flush()  # Applies the column defaults; the counters are None until then
     
     stats.total_workouts += 1
     if session.duration_minutes:
@@ -328,31 +729,31 @@ def _update_user_stats(db: Session, session: models.WorkoutSession):
 # ============== Exercise History ==============
 
 @router.get("/exercises/{exercise_id}/history", response_model=schemas.ExerciseHistoryResponse)
-def get_exercise_history(exercise_id: int, db: Session = Depends(get_db)):
+async def get_exercise_history(exercise_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get weight history for an exercise (no duplicates)."""
-    exercise = db.query(models.Exercise).filter(models.Exercise.id == exercise_id).first()
+    exercise = await db.get(models.Exercise, exercise_id)
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
     
-    # Get all logs for this exercise
-    logs = db.query(models.ExerciseLog).filter(
-        models.ExerciseLog.exercise_id == exercise_id,
-        models.ExerciseLog.weight_used.isnot(None)
-    ).order_by(models.ExerciseLog.logged_at.asc()).all()
-    
-    # Also get logs for exercises with the same name (across all circuits/days)
-    same_name_exercises = db.query(models.Exercise).filter(
-        models.Exercise.name == exercise.name
-    ).all()
-    
-    all_exercise_ids = [e.id for e in same_name_exercises]
+    # Logs for this exercise and every exercise sharing its catalog entry (across all circuits/days)
+    # (an IN subquery, so SQLite looks the logs up by exercise_id rather than scanning them)
+    log = models.ExerciseLog
+    if exercise.catalog_id is not None:
+        logs = select(log).where(log.exercise_id.in_(
+            select(models.Exercise.id).where(models.Exercise.catalog_id == exercise.catalog_id)
+        ))
+    else:
+        logs = select(log).where(log.exercise_id == exercise_id)
+    logs = logs.where(log.weight_used.isnot(None)).subquery()
     
-    all_logs = db.query(models.ExerciseLog).filter(
-        models.ExerciseLog.exercise_id.in_(all_exercise_ids),
-        models.ExerciseLog.weight_used.isnot(None)
-    ).order_by(models.ExerciseLog.logged_at.asc()).all()
+    total_logs, max_weight, last_weight = (await db.execute(select(
+        func.count(),
+        func.max(logs.c.weight_used),
+        select(logs.c.weight_used).order_by(logs.c.logged_at.desc(), logs.c.id.desc())
+        .limit(1).scalar_subquery()
+    ))).one()
     
-    if not all_logs:
+    if not total_logs:
         return schemas.ExerciseHistoryResponse(
             exercise_id=exercise_id,
             exercise_name=exercise.name,
@@ -362,23 +763,27 @@ def get_exercise_history(exercise_id: int, db: Session = Depends(get_db)):
             total_logs=0
         )
     
-    # Build history - dedupe by date (keep max weight per day)
-    history_by_date = {}
-    for log in all_logs:
-        date_str = log.logged_at.strftime("%Y-%m-%d")
-        if date_str not in history_by_date or log.weight_used > history_by_date[date_str]["weight"]:
-            history_by_date[date_str] = {
-                "date": date_str,
-                "weight": log.weight_used,
-                "reps": log.reps_completed
-            }
-    
-    history = list(history_by_date.values())
-    history.sort(key=lambda x: x["date"])
+    # Build history - one row per date, keeping the (earliest) max weight log of the day
+    log_date = func.date(logs.c.logged_at)
+    ranked = select(
+        log_date.label("date"),
+        logs.c.weight_used,
+        logs.c.reps_completed,
+        func.row_number().over(
+            partition_by=log_date,
+            order_by=(logs.c.weight_used.desc(), logs.c.logged_at, logs.c.id)
+        ).label("rank")
+    ).subquery()
+    rows = (await db.execute(
+        select(ranked.c.date, ranked.c.weight_used, ranked.c.reps_completed)
+        .where(ranked.c.rank == 1)
+        .order_by(ranked.c.date)
+    )).all()
     
-    # Get last and max weight
-    last_weight = all_logs[-1].weight_used if all_logs else None
-    max_weight = max((log.weight_used for log in all_logs), default=None)
+    history = [
+        schemas.WeightHistoryEntry(date=date, weight=weight, reps=reps)
+        for date, weight, reps in rows
+    ]
     
     return schemas.ExerciseHistoryResponse(
         exercise_id=exercise_id,
@@ -386,7 +791,7 @@ def get_exercise_history(exercise_id: int, db: Session = Depends(get_db)):
         history=history,
         last_weight=last_weight,
         max_weight=max_weight,
-        total_logs=len(all_logs)
+        total_logs=total_logs
     )
 
 
@@ -398,46 +803,14 @@ def create_workout_plan(
     db: Session = Depends(get_db)
 ):
     """Manually create a workout plan."""
-    plan = models.WorkoutPlan(
+    plan, _ = write_plan_tree(
+        db,
         name=plan_data.name,
-        description=plan_data.description
+        description=plan_data.description,
+        workout_days=[day.model_dump() for day in plan_data.workout_days]
     )
-    db.add(plan)
-    db.flush()
-    
-    for day_data in plan_data.workout_days:
-        day = models.WorkoutDay(
-            plan_id=plan.id,
-            name=day_data.name,
-            day_number=day_data.day_number,
-            muscle_groups=day_data.muscle_groups
-        )
-        db.add(day)
-        db.flush()
-        
-        for circuit_data in day_data.circuits:
-            circuit = models.Circuit(
-                workout_day_id=day.id,
-                circuit_number=circuit_data.circuit_number,
-                name=circuit_data.name,
-                rounds=circuit_data.rounds
-            )
-            db.add(circuit)
-            db.flush()
-            
-            for ex_data in circuit_data.exercises:
-                exercise = models.Exercise(
-                    circuit_id=circuit.id,
-                    name=ex_data.name,
-                    order=ex_data.order,
-                    sets=ex_data.sets,
-                    reps=ex_data.reps,
-                    weight_recommendation=ex_data.weight_recommendation,
-                    notes=ex_data.notes
-                )
-                db.add(exercise)
+    invalidate(db, "plans")
+    body = plan.snapshot
     
     db.commit()
-    db.refresh(plan)
-    return plan
-
+    return Response(body, media_type="application/json")
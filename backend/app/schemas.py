@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 
 # Exercise Schemas
@@ -22,6 +22,7 @@ class ExerciseCreate(ExerciseBase):
 class Exercise(ExerciseBase):
     id: int
     circuit_id: int
+    catalog_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -118,6 +119,8 @@ class ExerciseLogCreate(BaseModel):
     reps_completed: Optional[int] = None
     weight_used: Optional[float] = None
     completed: bool = False
+    # Client-generated key; resending a log with the same key returns the original log
+    idempotency_key: Optional[str] = Field(None, max_length=64)
 
 
 class ExerciseLog(ExerciseLogCreate):
@@ -131,6 +134,8 @@ class ExerciseLog(ExerciseLogCreate):
 class WorkoutSessionCreate(BaseModel):
     workout_day_id: int
     notes: Optional[str] = None
+    # Client-generated key; resending with the same key returns the original session
+    idempotency_key: Optional[str] = Field(None, max_length=64)
 
 
 class WorkoutSessionUpdate(BaseModel):
@@ -139,19 +144,47 @@ class WorkoutSessionUpdate(BaseModel):
     notes: Optional[str] = None
 
 
-class WorkoutSession(BaseModel):
+class WorkoutSessionSummary(BaseModel):
     id: int
     workout_day_id: int
     started_at: datetime
     completed_at: Optional[datetime] = None
     duration_minutes: Optional[int] = None
     notes: Optional[str] = None
+    idempotency_key: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class WorkoutSession(WorkoutSessionSummary):
     exercise_logs: List[ExerciseLog] = []
 
     class Config:
         from_attributes = True
 
 
+# Delta Sync
+class SyncWorkoutSession(WorkoutSessionSummary):
+    change_seq: int
+
+
+class SyncExerciseLog(ExerciseLog):
+    change_seq: int
+
+
+class SyncDeleted(BaseModel):
+    sessions: List[int] = []
+    exercise_logs: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    cursor: int  # pass as ?since= on the next sync
+    sessions: List[SyncWorkoutSession]
+    exercise_logs: List[SyncExerciseLog]
+    deleted: SyncDeleted
+
+
 # User Stats Schemas
 class UserStatsResponse(BaseModel):
     total_workouts: int
@@ -164,13 +197,52 @@ class UserStatsResponse(BaseModel):
         from_attributes = True
 
 
-# PDF Upload Response
-class PDFUploadResponse(BaseModel):
-    success: bool
-    message: str
+class TrainingRollup(BaseModel):
+    period: str  # day or week
+    period_start: date  # the day, or the Monday of the ISO week
+    muscle_group: str  # empty for totals across all muscle groups
+    sessions: int
+    sets: int
+    reps: int
+    tonnage: float  # sum of weight x reps
+    minutes: int
+
+    class Config:
+        from_attributes = True
+
+
+# PDF Upload Job
+class UploadJobStatus(BaseModel):
+    id: str
+    state: str  # queued, running, completed, failed
+    pages_done: int = 0
+    pages_total: int = 0
     plan_id: Optional[int] = None
+    message: Optional[str] = None
     workout_days_count: int = 0
     exercises_count: int = 0
+    cache_hit: bool = False
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ParseCacheStats(BaseModel):
+    hits: int
+    misses: int
+
+
+class ResponseCacheStats(BaseModel):
+    hits: int
+    misses: int
+    not_modified: int
+    hit_rate: float
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
 
 
 # Exercise History
@@ -0,0 +1,63 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, subqueryload
+
+from . import models, schemas
+
+# Bump when the WorkoutPlan or WorkoutDay response schemas change; older snapshots are then rebuilt
+SNAPSHOT_VERSION = 1
+
+
+def store_plan_snapshots(db: Session, plan_id: int) -> models.WorkoutPlan:
+    """
+    Serialize a plan and each of its days once, as GET /api/plans/{id} and /api/days/{id}
+    return them, and store the JSON on the rows. The caller commits.
+    """
+    plan = db.scalars(
+        select(models.WorkoutPlan).options(
+            subqueryload(models.WorkoutPlan.workout_days)
+            .subqueryload(models.WorkoutDay.circuits)
+            .subqueryload(models.Circuit.exercises)
+        ).where(models.WorkoutPlan.id == plan_id)
+    ).one()
+    plan_model = schemas.WorkoutPlan.model_validate(plan)
+    plan.snapshot = plan_model.model_dump_json().encode()
+    plan.snapshot_version = SNAPSHOT_VERSION
+    # Day snapshots reuse the validated plan, so the tree is only walked once
+    for day, day_model in zip(plan.workout_days, plan_model.workout_days):
+        day.snapshot = day_model.model_dump_json().encode()
+        day.snapshot_version = SNAPSHOT_VERSION
+    return plan
+
+
+def plan_snapshot(db: Session, plan_id: int) -> Optional[bytes]:
+    """A plan's JSON, or None if there is no such plan. Rebuilds and commits a missing or outdated snapshot."""
+    row = db.execute(
+        select(models.WorkoutPlan.snapshot, models.WorkoutPlan.snapshot_version)
+        .where(models.WorkoutPlan.id == plan_id)
+    ).first()
+    if row is None:
+        return None
+    if row.snapshot is not None and row.snapshot_version == SNAPSHOT_VERSION:
+        return row.snapshot
+    plan = store_plan_snapshots(db, plan_id)
+    snapshot = plan.snapshot
+    db.commit()
+    return snapshot
+
+
+def day_snapshot(db: Session, day_id: int) -> Optional[bytes]:
+    """A day's JSON, or None if there is no such day. Rebuilds and commits its plan's snapshots if needed."""
+    row = db.execute(
+        select(models.WorkoutDay.plan_id, models.WorkoutDay.snapshot, models.WorkoutDay.snapshot_version)
+        .where(models.WorkoutDay.id == day_id)
+    ).first()
+    if row is None:
+        return None
+    if row.snapshot is not None and row.snapshot_version == SNAPSHOT_VERSION:
+        return row.snapshot
+    plan = store_plan_snapshots(db, row.plan_id)
+    snapshot = next(day.snapshot for day in plan.workout_days if day.id == day_id)
+    db.commit()
+    return snapshot
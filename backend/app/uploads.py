@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import List, Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .parse_cache import PARSE_CACHE_DIR, ParseCache
+from .pdf_parser import PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = "./data/uploads"
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Bytes per read when streaming a file
+UPLOAD_SEND_CHUNK_SIZE = 256 * 1024
+
+# When nginx fronts the app: an internal location aliased to UPLOAD_DIR (e.g. "/_uploads/").
+# Responses then only carry X-Accel-Redirect and nginx sends the file itself, with sendfile.
+UPLOADS_ACCEL_REDIRECT = os.getenv("UPLOADS_ACCEL_REDIRECT", "")
+# Seconds between sweeps for unreferenced uploads (0 turns the sweeper off), and how old an
+# unreferenced file must be before it is removed; a file is unreferenced while its import runs
+UPLOAD_SWEEP_INTERVAL = int(os.getenv("UPLOAD_SWEEP_INTERVAL", "3600"))
+UPLOAD_SWEEP_MIN_AGE = int(os.getenv("UPLOAD_SWEEP_MIN_AGE", "86400"))
+
+# Stored uploads are named by the SHA-256 of their content, so a name always means the same bytes
+STORED_NAME_RE = re.compile(r"^([0-9a-f]{64})\.pdf$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+router = APIRouter()
+
+
+def stored_filename(content_hash: str) -> str:
+    return f"{content_hash}.pdf"
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_SEND_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ============== Serving ==============
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    First-to-last byte (inclusive) for a single "bytes=" range, or None to send the whole file:
+    the header is malformed or asks for several ranges, which servers may answer in full.
+    Raises 416 for a range that starts past the end.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:  # "bytes=-500": the final 500 bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if start > end:
+        return None
+    return start, end
+
+
+class FileRangeResponse(Response):
+    """
+    Bytes start..end (inclusive) of a file. The whole file goes through the ASGI pathsend
+    extension when the server offers it, so the server can send it without copying it
+    through Python; otherwise it is read and sent in chunks.
+    """
+
+    def __init__(self, path: str, start: int, end: int, size: int, headers: dict):
+        partial = (start, end) != (0, size - 1)
+        headers = {**headers, "Content-Length": str(end - start + 1)}
+        if partial:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        super().__init__(status_code=206 if partial else 200, headers=headers, media_type="application/pdf")
+        self.path = path
+        self.start = start
+        self.end = end
+        self.partial = partial
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if not self.partial and "http.response.pathsend" in scope.get("extensions", {}):
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            return
+
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, "rb") as f:
+            await f.seek(self.start)
+            while remaining > 0:
+                chunk = await f.read(min(UPLOAD_SEND_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b""})
+
+
+@router.api_route("/uploads/{filename}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_upload(filename: str, request: Request):
+    """Serve an uploaded PDF. Content-addressed, so it can be cached forever and ranges always line up."""
+    match = STORED_NAME_RE.match(filename)
+    if not match:
+        raise HTTPException(status_code=404, detail="File not found")
+    path = os.path.join(UPLOAD_DIR, filename)
+    try:
+        size = (await anyio.to_thread.run_sync(os.stat, path)).st_size
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    etag = f'"{match.group(1)}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"):
+        return Response(status_code=304, headers=headers)
+    if UPLOADS_ACCEL_REDIRECT:
+        # nginx answers ranges and conditional requests for the file itself
+        return Response(headers={**headers, "X-Accel-Redirect": UPLOADS_ACCEL_REDIRECT + filename},
+                        media_type="application/pdf")
+
+    start, end = 0, size - 1
+    range_header = request.headers.get("range")
+    # If-Range: only honour the range if the client's copy is this file
+    if range_header and size and request.headers.get("if-range", etag) == etag:
+        start, end = _parse_range(range_header, size) or (start, end)
+    return FileRangeResponse(path, start, end, size, headers)
+
+
+# ============== Sweeper ==============
+
+def sweep_uploads(db: Session, upload_dir: str = UPLOAD_DIR, min_age: int = UPLOAD_SWEEP_MIN_AGE,
+                  parse_cache_dir: str = PARSE_CACHE_DIR) -> List[str]:
+    """
+    Delete stored uploads no WorkoutPlan.pdf_filename refers to, and interrupted uploads' .part
+    files, once older than min_age seconds. Files not named by a content hash are left alone.
+    Then prunes the parse cache: entries for PDFs no longer stored, or from older parser versions.
+    """
+    referenced = set(db.scalars(
+        select(models.WorkoutPlan.pdf_filename).where(models.WorkoutPlan.pdf_filename.isnot(None))
+    ))
+    cutoff = time.time() - min_age
+    removed = []
+    for entry in os.scandir(upload_dir):
+        if not (STORED_NAME_RE.match(entry.name) or entry.name.endswith(".part")):
+            continue
+        if not entry.is_file() or entry.name in referenced or entry.stat().st_mtime > cutoff:
+            continue
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            continue
+        removed.append(entry.name)
+    if removed:
+        logger.info(f"Removed {len(removed)} unreferenced uploads")
+
+    stored_hashes = {match.group(1) for match in map(STORED_NAME_RE.match, os.listdir(upload_dir)) if match}
+    pruned = ParseCache(parse_cache_dir).prune(PARSER_VERSION, stored_hashes)
+    if pruned:
+        logger.info(f"Removed {len(pruned)} parse cache entries")
+    return removed
+
+
+def _sweep_once():
+    from .database import SessionLocal
+
+    with SessionLocal() as db:
+        sweep_uploads(db)
+
+
+async def sweep_periodically(interval: int = UPLOAD_SWEEP_INTERVAL):
+    """Run sweep_uploads every interval seconds, on a worker thread. Started by the app's lifespan."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await anyio.to_thread.run_sync(_sweep_once)
+        except Exception:
+            logger.exception("Upload sweep failed")
+
+
+def main():
+    """Command line: python -m app.uploads sweep [--min-age SECONDS]"""
+    arg_parser = argparse.ArgumentParser(description="Maintain uploaded PDF files.")
+    arg_parser.add_argument("command", choices=["sweep"])
+    arg_parser.add_argument("--min-age", type=int, default=UPLOAD_SWEEP_MIN_AGE,
+                            help="only remove unreferenced files older than this many seconds")
+    args = arg_parser.parse_args()
+
+    from .database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        removed = sweep_uploads(db, min_age=args.min_age)
+    logger.info(f"Sweep done: {len(removed)} files removed")
+
+
+if __name__ == "__main__":
+    main()
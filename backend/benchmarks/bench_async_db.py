@@ -0,0 +1,160 @@
+"""
+Sync vs async database path under concurrent clients.
+
+Each simulated client runs the ActiveWorkout loop against a fresh database for a fixed time:
+log a set, then fetch the workout day. The two modes run the same statements:
+
+- "sync": a blocking Session per request, dispatched to a thread pool of --threads workers
+  the way FastAPI runs sync endpoints (anyio.to_thread with a capacity limiter; FastAPI's
+  default is 40)
+- "async": the async route functions (routes.log_exercise, routes.get_workout_day) on an
+  AsyncSession, all on the event loop
+
+The response cache is turned off so every day fetch reaches the database.
+
+Reports requests/sec, latency percentiles and the peak number of threads in the process, as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_async_db [--clients 10 100] [--threads 40] [--seconds 5]
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from typing import List
+
+import anyio
+from sqlalchemy import select
+from sqlalchemy.orm import subqueryload
+
+from app import models, routes, schemas
+from app.response_cache import ResponseCache
+from app.plan_writer import write_plan_tree
+from benchmarks.common import async_session_factory, synthetic_workout_days, temp_database
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _sync_log_set(SessionLocal, session_id: int, exercise_id: int):
+    db = SessionLocal()
+    try:
+        session = db.get(models.WorkoutSession, session_id)
+        log = models.ExerciseLog(session_id=session.id, exercise_id=exercise_id,
+                                 set_number=1, reps_completed=10, weight_used=50.0)
+        db.add(log)
+        db.commit()
+        db.refresh(log)
+        return schemas.ExerciseLog.model_validate(log)
+    finally:
+        db.close()
+
+
+def _sync_get_day(SessionLocal, day_id: int):
+    db = SessionLocal()
+    try:
+        day = db.scalars(
+            select(models.WorkoutDay).options(
+                subqueryload(models.WorkoutDay.circuits).subqueryload(models.Circuit.exercises)
+            ).where(models.WorkoutDay.id == day_id)
+        ).first()
+        return schemas.WorkoutDay.model_validate(day).model_dump_json()
+    finally:
+        db.close()
+
+
+async def _run_mode(mode: str, clients: int, threads: int, seconds: float) -> dict:
+    with temp_database() as (engine, SessionLocal):
+        with SessionLocal() as db:
+            plan, _ = write_plan_tree(db, "Bench Plan", synthetic_workout_days(weeks=1))
+            day_id = plan.workout_days[0].id
+            exercise_id = db.scalar(select(models.Exercise.id))
+            session = models.WorkoutSession(workout_day_id=day_id)
+            db.add(session)
+            db.commit()
+            session_id = session.id
+
+        async_engine, AsyncSessionLocal = async_session_factory(engine)
+        limiter = anyio.CapacityLimiter(threads)
+        latencies: List[float] = []
+        errors = 0
+        peak_threads = threading.active_count()
+        deadline = time.perf_counter() + seconds
+
+        async def sync_request(fn, *args):
+            return await anyio.to_thread.run_sync(fn, SessionLocal, *args, limiter=limiter)
+
+        async def async_log_set():
+            async with AsyncSessionLocal() as db:
+                log = await routes.log_exercise(
+                    session_id,
+                    schemas.ExerciseLogCreate(exercise_id=exercise_id, set_number=1,
+                                              reps_completed=10, weight_used=50.0),
+                    db,
+                )
+                return schemas.ExerciseLog.model_validate(log)
+
+        async def async_get_day():
+            async with AsyncSessionLocal() as db:
+                return await routes.get_workout_day(day_id, None, db)
+
+        async def client():
+            nonlocal errors, peak_threads
+            while time.perf_counter() < deadline:
+                for request in ("log", "day"):
+                    start = time.perf_counter()
+                    try:
+                        if mode == "sync":
+                            if request == "log":
+                                await sync_request(_sync_log_set, session_id, exercise_id)
+                            else:
+                                await sync_request(_sync_get_day, day_id)
+                        elif request == "log":
+                            await async_log_set()
+                        else:
+                            await async_get_day()
+                        latencies.append(time.perf_counter() - start)
+                    except Exception:
+                        errors += 1
+                    peak_threads = max(peak_threads, threading.active_count())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        await async_engine.dispose()
+
+    return {
+        "requests": len(latencies),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "peak_threads": peak_threads,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--clients", type=int, nargs="+", default=[10, 100])
+    arg_parser.add_argument("--threads", type=int, default=40, help="thread pool size for sync mode")
+    arg_parser.add_argument("--seconds", type=float, default=5.0)
+    arg_parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    args = arg_parser.parse_args()
+
+    routes.response_cache = ResponseCache(max_entries=0)
+    results = {}
+    for clients in args.clients:
+        for mode in args.modes:
+            results.setdefault(f"{clients}_clients", {})[mode] = asyncio.run(
+                _run_mode(mode, clients, args.threads, args.seconds))
+    print(json.dumps({"threads": args.threads, "seconds": args.seconds, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Micro-benchmark for the parser's line classification.
+
+Compares the original per-pattern loops (re.search per skip pattern, substring scan per
+keyword) with the compiled LineClassifier on every text line and table row of the bundled
+sample PDF, and checks both give the same answers.
+
+Usage (from backend/):
+    python -m benchmarks.bench_classifier [--pdf PATH] [--repeat N]
+"""
+import argparse
+import json
+import re
+import time
+
+import pdfplumber
+
+from app.pdf_parser import WorkoutPDFParser, LineClassifier
+
+SAMPLE_PDF = "data/uploads/ETSv2compressed 2.pdf"
+
+
+def load_lines(pdf_path):
+    """Lowercased text lines and first table cells, as the parser sees them."""
+    lines = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            for table in page.extract_tables():
+                for row in table:
+                    if row and row[0]:
+                        lines.append(str(row[0]).strip().lower())
+            text = page.extract_text() or ""
+            lines.extend(line.strip().lower() for line in text.split("\n") if line.strip())
+    return lines
+
+
+def legacy_classify(parser, line_lower):
+    for pattern in parser.skip_patterns:
+        if re.search(pattern, line_lower):
+            return LineClassifier.SKIP
+    if any(ex in line_lower for ex in parser.common_exercises):
+        return LineClassifier.EXERCISE
+    return None
+
+
+def legacy_muscle_groups(parser, line_lower):
+    return [mg for mg in parser.muscle_groups if mg in line_lower]
+
+
+def run(fn, lines, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            fn(line)
+    elapsed = time.perf_counter() - start
+    return len(lines) * repeat / elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--pdf", default=SAMPLE_PDF)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    parser = WorkoutPDFParser()
+    classifier = parser.classifier
+    lines = load_lines(args.pdf)
+
+    for line in lines:
+        assert legacy_classify(parser, line) == classifier.classify(line), line
+        assert legacy_muscle_groups(parser, line) == classifier.find_muscle_groups(line), line
+
+    results = {
+        "lines": len(lines),
+        "classify_lines_per_sec": {
+            "before": run(lambda line: legacy_classify(parser, line), lines, args.repeat),
+            "after": run(classifier.classify, lines, args.repeat),
+        },
+        "muscle_groups_lines_per_sec": {
+            "before": run(lambda line: legacy_muscle_groups(parser, line), lines, args.repeat),
+            "after": run(classifier.find_muscle_groups, lines, args.repeat),
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Request latency while a PDF import runs.
+
+Starts uvicorn on a fresh database, then times a light endpoint (GET /api/stats by default)
+from one client, first with the server idle and then while a PDF uploaded through
+POST /api/plans/upload is parsed and imported. An import should leave the second set of
+numbers close to the first: parsing runs in the parser process, not on the server's threads.
+
+Reports p50/p95/max in ms for both phases, and the import's duration, as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_import_latency [--pdf PATH] [--endpoint /api/stats] [--idle-seconds 5]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import urllib.request
+import uuid
+from typing import List
+
+from benchmarks.bench_load import start_server
+from benchmarks.bench_parser import SAMPLE_PDF
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _summary(latencies: List[float]) -> dict:
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 2),
+    }
+
+
+def _timed_get(url: str) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def upload(base_url: str, pdf_path: str) -> str:
+    """POST the PDF as multipart/form-data; returns the job id."""
+    boundary = uuid.uuid4().hex
+    with open(pdf_path, "rb") as f:
+        content = f.read()
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"bench.pdf\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(
+        f"{base_url}/api/plans/upload", data=body, method="POST",
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["id"]
+
+
+def job_state(base_url: str, job_id: str) -> str:
+    with urllib.request.urlopen(f"{base_url}/api/jobs/{job_id}") as response:
+        return json.load(response)["state"]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--pdf", default=SAMPLE_PDF)
+    arg_parser.add_argument("--endpoint", default="/api/stats")
+    arg_parser.add_argument("--idle-seconds", type=float, default=5)
+    arg_parser.add_argument("--interval", type=float, default=0.01, help="pause between requests")
+    args = arg_parser.parse_args()
+    pdf_path = os.path.abspath(args.pdf)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        database_url = f"sqlite:///{os.path.join(work_dir, 'import.db')}"
+        with open(os.path.join(work_dir, "server.log"), "wb") as log_file:
+            server, base_url = start_server(work_dir, database_url, log_file)
+            try:
+                url = base_url + args.endpoint
+                for _ in range(20):  # warm up
+                    _timed_get(url)
+
+                idle = []
+                deadline = time.monotonic() + args.idle_seconds
+                while time.monotonic() < deadline:
+                    idle.append(_timed_get(url))
+                    time.sleep(args.interval)
+
+                importing = []
+                start = time.monotonic()
+                job_id = upload(base_url, pdf_path)
+                checked = time.monotonic()
+                state = "queued"
+                while state in ("queued", "running"):
+                    importing.append(_timed_get(url))
+                    time.sleep(args.interval)
+                    if time.monotonic() - checked > 0.25:
+                        state, checked = job_state(base_url, job_id), time.monotonic()
+                import_seconds = time.monotonic() - start
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(json.dumps({
+        "endpoint": args.endpoint,
+        "idle": _summary(idle),
+        "during_import": _summary(importing),
+        "import_state": state,
+        "import_seconds": round(import_seconds, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
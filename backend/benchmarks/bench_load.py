@@ -0,0 +1,362 @@
+"""
+Gym-floor load test: many lifters running the ActiveWorkout flow against a live uvicorn.
+
+Each simulated user repeats whole workouts, issuing the requests the client does:
+
+1. POST /api/sessions for a workout day, then GET /api/sessions/{id} and GET /api/days/{id}
+2. per exercise: GET /api/exercises/{id}/history, then its sets, each taking --set-seconds
+   followed by --rest-seconds of rest. The exercise's sets go up in one
+   POST /api/sessions/{id}/logs when it is done (--log-mode set posts each set to
+   /api/sessions/{id}/log instead, as older clients did)
+3. PATCH /api/sessions/{id} with completed_at and duration_minutes
+
+Set and rest times are multiplied by --time-scale (0.01 by default: a 90 s rest takes 0.9 s,
+and a seeded 36-set workout about 47 s) with +/-25% jitter, and users start spread over
+--ramp-up seconds, so requests don't arrive in lockstep. At --time-scale 0.01 each user sends
+roughly the traffic of 100 real lifters; use 1 to simulate real lifters one for one.
+
+By default the script starts uvicorn (one worker, as the app needs) on a temporary SQLite
+database seeded with a --weeks plan and past sessions for the history reads; --url runs against
+a server that is already up.
+
+Reports, as JSON: requests/sec, and per endpoint the count, p50/p95/p99 latency in ms and error
+rate; workouts and sets completed; and, when the script started the server, how many failed
+requests were "database is locked" (SQLite busy timeout) errors in the server log.
+
+Usage (from backend/):
+    python -m benchmarks.bench_load [--users 10 50 100] [--seconds 60] [--time-scale 0.01]
+    python -m benchmarks.bench_load --url http://127.0.0.1:8000 --users 50
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import create_db_engine
+from app.migrations import run_migrations
+from app.plan_writer import write_plan_tree
+from benchmarks.common import synthetic_workout_days
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOCKED_MESSAGE = "database is locked"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _leading_int(value, default: int) -> int:
+    """The client's parseInt(value) || default: "10-12" is 10."""
+    match = re.match(r"\s*(\d+)", str(value or ""))
+    return (int(match.group(1)) or default) if match else default
+
+
+# ============== Server ==============
+
+def seed_database(url: str, weeks: int, history_sessions: int):
+    """A plan plus completed past sessions with logged sets, so history reads have rows to scan."""
+    engine = create_db_engine(url)
+    run_migrations(engine)
+    with Session(engine) as db:
+        plan, _ = write_plan_tree(db, "Load Test Plan", synthetic_workout_days(weeks=weeks))
+        days = plan.workout_days
+        start = datetime.utcnow() - timedelta(days=history_sessions)
+        for n in range(history_sessions):
+            day = days[n % len(days)]
+            started = start + timedelta(days=n)
+            session = models.WorkoutSession(workout_day_id=day.id, started_at=started,
+                                            completed_at=started + timedelta(minutes=45), duration_minutes=45)
+            db.add(session)
+            db.flush()
+            db.add_all([
+                models.ExerciseLog(session_id=session.id, exercise_id=exercise.id, set_number=set_number,
+                                   reps_completed=10, weight_used=20.0 + n, completed=True,
+                                   logged_at=started + timedelta(minutes=set_number))
+                for circuit in day.circuits for exercise in circuit.exercises for set_number in (1, 2, 3)
+            ])
+        db.commit()
+    engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(work_dir: str, database_url: str, log_file, timeout: float = 60.0):
+    """Spawn uvicorn in work_dir and wait for /health. Returns (process, base URL)."""
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR, "DATABASE_URL": database_url}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=log_file
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1):
+                return server, base_url
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    raise TimeoutError("uvicorn did not answer /health")
+
+
+def count_lock_errors(log_path: str) -> int:
+    """Tracebacks in the server log whose error is SQLite's busy timeout."""
+    with open(log_path, errors="replace") as f:
+        tracebacks = f.read().split("Exception in ASGI application")[1:]
+    return sum(LOCKED_MESSAGE in traceback for traceback in tracebacks)
+
+
+# ============== Simulated Users ==============
+
+class Stats:
+    """Latencies and statuses per endpoint, for one user; merged at the end."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.workouts = 0
+        self.sets = 0
+
+    def record(self, endpoint: str, seconds: float, status: int):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        self.statuses.setdefault(endpoint, Counter())[status] += 1
+
+    def merge(self, other: "Stats"):
+        for endpoint, values in other.latencies.items():
+            self.latencies.setdefault(endpoint, []).extend(values)
+        for endpoint, counts in other.statuses.items():
+            self.statuses.setdefault(endpoint, Counter()).update(counts)
+        self.workouts += other.workouts
+        self.sets += other.sets
+
+
+class Client:
+    """One keep-alive connection, like a browser tab. Status 0 means the request never got an answer."""
+
+    def __init__(self, base_url: str, stats: Stats):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+        self.stats = stats
+
+    def request(self, endpoint: str, method: str, path: str, body=None):
+        """JSON body of a 2xx response, or None."""
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        start = time.perf_counter()
+        # A second attempt only if the server had closed the idle keep-alive connection (uvicorn
+        # does after 5 s); browsers resend on a fresh connection then, too
+        for attempt in (1, 2):
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                status = response.status
+                break
+            except (ConnectionResetError, BrokenPipeError, http.client.RemoteDisconnected):
+                self.connection.close()  # Reconnects on the next request
+                status, data = 0, b""
+            except (OSError, http.client.HTTPException):
+                self.connection.close()
+                status, data = 0, b""
+                break
+        self.stats.record(endpoint, time.perf_counter() - start, status)
+        return json.loads(data) if 200 <= status < 300 and data else None
+
+    def close(self):
+        self.connection.close()
+
+
+class Lifter:
+    def __init__(self, user_id: int, base_url: str, day_ids: List[int], args, deadline: float):
+        self.rng = random.Random(user_id)
+        self.stats = Stats()
+        self.client = Client(base_url, self.stats)
+        self.day_ids = day_ids
+        self.args = args
+        self.deadline = deadline
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep a jittered, time-scaled interval; False once the test is over."""
+        remaining = self.deadline - time.monotonic()
+        time.sleep(max(0.0, min(seconds * self.args.time_scale * self.rng.uniform(0.75, 1.25), remaining)))
+        return time.monotonic() < self.deadline
+
+    def run(self, start_delay: float):
+        time.sleep(start_delay)
+        while time.monotonic() < self.deadline:
+            if self.workout():
+                self.stats.workouts += 1
+            else:
+                time.sleep(max(0.0, min(1.0, self.deadline - time.monotonic())))  # Back off, then retry
+        self.client.close()
+
+    def workout(self) -> bool:
+        """One session from start to completion. False if it failed or the test ended part-way."""
+        request = self.client.request
+        started = time.monotonic()
+        session = request("POST /api/sessions", "POST", "/api/sessions", {
+            "workout_day_id": self.rng.choice(self.day_ids), "idempotency_key": uuid.uuid4().hex
+        })
+        if session is None:
+            return False
+        session_id = session["id"]
+        request("GET /api/sessions/{session_id}", "GET", f"/api/sessions/{session_id}")
+        day = request("GET /api/days/{day_id}", "GET", f"/api/days/{session['workout_day_id']}")
+        if day is None:
+            return False
+
+        for circuit in day["circuits"]:
+            for exercise in circuit["exercises"]:
+                history = request("GET /api/exercises/{exercise_id}/history", "GET",
+                                  f"/api/exercises/{exercise['id']}/history")
+                weight = (history or {}).get("last_weight") or 20.0
+                if not self.log_sets(session_id, exercise, weight):
+                    return False
+
+        completed = request("PATCH /api/sessions/{session_id}", "PATCH", f"/api/sessions/{session_id}", {
+            "completed_at": datetime.utcnow().isoformat(),
+            "duration_minutes": int((time.monotonic() - started) / self.args.time_scale / 60)
+        })
+        return completed is not None
+
+    def log_sets(self, session_id: int, exercise: dict, weight: float) -> bool:
+        pending = []
+        for set_number in range(1, _leading_int(exercise["sets"], 3) + 1):
+            if not self.wait(self.args.set_seconds):
+                return False
+            log = {
+                "exercise_id": exercise["id"], "set_number": set_number,
+                "reps_completed": _leading_int(exercise["reps"], 10),
+                "weight_used": weight, "completed": True, "idempotency_key": uuid.uuid4().hex,
+            }
+            if self.args.log_mode == "set":
+                if self.client.request("POST /api/sessions/{session_id}/log", "POST",
+                                       f"/api/sessions/{session_id}/log", log) is None:
+                    return False
+                self.stats.sets += 1
+            else:
+                pending.append(log)
+            if not self.wait(self.args.rest_seconds):
+                return False
+        if pending:
+            if self.client.request("POST /api/sessions/{session_id}/logs", "POST",
+                                   f"/api/sessions/{session_id}/logs", pending) is None:
+                return False
+            self.stats.sets += len(pending)
+        return True
+
+
+def run_load(base_url: str, users: int, args) -> dict:
+    with urllib.request.urlopen(f"{base_url}/api/days") as response:
+        day_ids = [day["id"] for day in json.load(response)]
+    if not day_ids:
+        raise SystemExit("No workout days on the server; import a plan first")
+
+    start = time.monotonic()
+    deadline = start + args.ramp_up + args.seconds
+    lifters = [Lifter(n, base_url, day_ids, args, deadline) for n in range(users)]
+    threads = [
+        threading.Thread(target=lifter.run, args=(args.ramp_up * n / users,), daemon=True)
+        for n, lifter in enumerate(lifters)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    stats = Stats()
+    for lifter in lifters:
+        stats.merge(lifter.stats)
+    total = sum(len(values) for values in stats.latencies.values())
+    errors = sum(n for counts in stats.statuses.values() for status, n in counts.items() if not 200 <= status < 300)
+    endpoints = {}
+    for endpoint, values in sorted(stats.latencies.items()):
+        counts = stats.statuses[endpoint]
+        failed = sum(n for status, n in counts.items() if not 200 <= status < 300)
+        endpoints[endpoint] = {
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 99) * 1000, 2),
+            "error_rate": round(failed / len(values), 4),
+            "errors_by_status": {str(status): n for status, n in counts.items() if not 200 <= status < 300},
+        }
+    return {
+        "users": users,
+        "seconds": round(elapsed, 1),
+        "requests": total,
+        "requests_per_sec": round(total / elapsed, 1),
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "workouts_completed": stats.workouts,
+        "sets_logged": stats.sets,
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--users", type=int, nargs="+", default=[10, 50, 100])
+    arg_parser.add_argument("--seconds", type=float, default=60, help="test length after ramp-up")
+    arg_parser.add_argument("--ramp-up", type=float, default=5)
+    arg_parser.add_argument("--time-scale", type=float, default=0.01)
+    arg_parser.add_argument("--set-seconds", type=float, default=40, help="time to perform one set")
+    arg_parser.add_argument("--rest-seconds", type=float, default=90, help="rest after each set")
+    arg_parser.add_argument("--log-mode", choices=["batch", "set"], default="batch")
+    arg_parser.add_argument("--weeks", type=int, default=12, help="size of the seeded plan")
+    arg_parser.add_argument("--history-sessions", type=int, default=100)
+    arg_parser.add_argument("--url", help="run against this server instead of starting one")
+    args = arg_parser.parse_args()
+
+    results = []
+    for users in args.users:
+        if args.url:
+            results.append(run_load(args.url.rstrip("/"), users, args))
+            continue
+        # A fresh server and database per run, so runs don't see each other's sessions
+        with tempfile.TemporaryDirectory() as work_dir:
+            database_url = f"sqlite:///{os.path.join(work_dir, 'load.db')}"
+            seed_database(database_url, args.weeks, args.history_sessions)
+            log_path = os.path.join(work_dir, "server.log")
+            with open(log_path, "wb") as log_file:
+                server, base_url = start_server(work_dir, database_url, log_file)
+                try:
+                    result = run_load(base_url, users, args)
+                finally:
+                    server.terminate()
+                    server.wait()
+            result["lock_timeouts"] = count_lock_errors(log_path)
+            results.append(result)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Per-request cost of MetricsMiddleware.
+
+Calls a small FastAPI app directly through ASGI (no server or socket, so the middleware is a
+large share of each request), with and without MetricsMiddleware, in alternating rounds, and
+reports microseconds per request for each and the difference. Also times rendering /metrics.
+
+Usage (from backend/):
+    python -m benchmarks.bench_metrics_overhead [--requests 20000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fastapi import FastAPI
+
+from app.metrics import REGISTRY, MetricsMiddleware
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id, "name": "Barbell Bench Press"}
+
+    return app
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def run_requests(asgi_app, count: int) -> float:
+    """Seconds per request."""
+    start = time.perf_counter()
+    for n in range(count):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/items/{n % 100}", "raw_path": b"", "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        }
+        await asgi_app(scope, _receive, _send)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--requests", type=int, default=20000)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    app = build_app()
+    apps = {"without_metrics": app, "with_metrics": MetricsMiddleware(app)}
+    timings = {label: [] for label in apps}
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(run_requests(app, 1000))  # warm up
+    for _ in range(args.rounds):
+        for label, asgi_app in apps.items():
+            timings[label].append(loop.run_until_complete(run_requests(asgi_app, args.requests)))
+    loop.close()
+
+    results = {label: round(statistics.median(values) * 1e6, 2) for label, values in timings.items()}
+    start = time.perf_counter()
+    body = REGISTRY.render()
+    render_ms = (time.perf_counter() - start) * 1000
+    print(json.dumps({
+        "us_per_request": results,
+        "overhead_us": round(results["with_metrics"] - results["without_metrics"], 2),
+        "overhead_pct": round(100 * (results["with_metrics"] / results["without_metrics"] - 1), 1),
+        "render_metrics_ms": round(render_ms, 3),
+        "render_metrics_bytes": len(body),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark suite for WorkoutPDFParser.parse_pdf.
+
+Parses the bundled sample PDF and generated table- and text-layout PDFs of several sizes.
+Each case runs in a fresh subprocess so peak RSS is measured per case. Reports wall time
+split into extraction (pdfplumber page reads) and classification (everything else), pages/sec
+and peak RSS, as JSON that can be diffed across commits.
+
+Usage (from backend/):
+    python -m benchmarks.bench_parser [--pages 25 100 200] [--layouts table text]
+                                      [--workers N] [--repeat N] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.pdf_generator import generate_pdf
+
+SAMPLE_PDF = "data/uploads/ETSv2compressed 2.pdf"
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_case(pdf_path: str, workers: int, repeat: int) -> dict:
+    """Parse one PDF repeat times in this process and return the best timings."""
+    from app.pdf_parser import WorkoutPDFParser
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+
+    best = None
+    for _ in range(repeat):
+        parser = WorkoutPDFParser(workers=workers)
+        extract_time = 0.0
+        iter_pages = parser._iter_pages
+
+        def timed_iter_pages(*args, **kwargs):
+            # Time spent producing pages is extraction; the rest of parse_pdf is classification
+            nonlocal extract_time
+            pages = iter_pages(*args, **kwargs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    page = next(pages)
+                except StopIteration:
+                    extract_time += time.perf_counter() - start
+                    return
+                extract_time += time.perf_counter() - start
+                yield page
+
+        parser._iter_pages = timed_iter_pages
+        start = time.perf_counter()
+        result = parser.parse_pdf(pdf_path)
+        wall = time.perf_counter() - start
+
+        if best is None or wall < best["wall_s"]:
+            best = {
+                "wall_s": round(wall, 4),
+                "extract_s": round(extract_time, 4),
+                "classify_s": round(wall - extract_time, 4),
+            }
+
+    return {
+        "pages": page_count,
+        **best,
+        "pages_per_sec": round(page_count / best["wall_s"], 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "workout_days": len(result["workout_days"]),
+        "exercises": sum(len(c["exercises"]) for d in result["workout_days"] for c in d["circuits"]),
+    }
+
+
+def _run_case_subprocess(pdf_path: str, workers: int, repeat: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_parser", "--case", pdf_path,
+         "--workers", str(workers), "--repeat", str(repeat)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--pages", type=int, nargs="+", default=[25, 100, 200])
+    arg_parser.add_argument("--layouts", nargs="+", choices=["table", "text"], default=["table", "text"])
+    arg_parser.add_argument("--workers", type=int, default=1)
+    arg_parser.add_argument("--repeat", type=int, default=1)
+    arg_parser.add_argument("--no-sample", action="store_true", help="skip the bundled sample PDF")
+    arg_parser.add_argument("--output", help="write JSON here instead of stdout")
+    arg_parser.add_argument("--case", help=argparse.SUPPRESS)  # internal: run one case in this process
+    args = arg_parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.workers, args.repeat)))
+        return
+
+    results = []
+    if not args.no_sample and os.path.exists(SAMPLE_PDF):
+        results.append({"pdf": "sample", "layout": "sample",
+                        **_run_case_subprocess(SAMPLE_PDF, args.workers, args.repeat)})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for layout in args.layouts:
+            for pages in args.pages:
+                path = os.path.join(tmp_dir, f"{layout}-{pages}.pdf")
+                generate_pdf(path, pages, layout)
+                results.append({"pdf": f"synthetic-{layout}-{pages}", "layout": layout,
+                                **_run_case_subprocess(path, args.workers, args.repeat)})
+                print(f"{results[-1]['pdf']}: {results[-1]['wall_s']}s", file=sys.stderr)
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "workers": args.workers,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark for importing plan trees.
+
+Imports a large synthetic plan with the bulk plan-tree writer (one INSERT per level) and
+with the previous node-by-node path (flush after every day and circuit), each in its own
+transaction on a fresh SQLite file, and reports rows/sec. The bulk writer's time includes
+serializing the plan's JSON snapshots.
+
+Usage (from backend/):
+    python -m benchmarks.bench_plan_import [--weeks 52] [--repeat 3]
+"""
+import argparse
+import json
+import time
+
+from app import models
+from app.plan_writer import write_plan_tree
+from benchmarks.common import temp_database, synthetic_workout_days, count_rows
+
+
+def node_by_node_import(db, name, workout_days):
+    """The import path used before the bulk writer."""
+    plan = models.WorkoutPlan(name=name)
+    db.add(plan)
+    db.flush()
+    for day_data in workout_days:
+        day = models.WorkoutDay(plan_id=plan.id, name=day_data["name"],
+                                day_number=day_data["day_number"],
+                                muscle_groups=day_data.get("muscle_groups"))
+        db.add(day)
+        db.flush()
+        for circuit_data in day_data["circuits"]:
+            circuit = models.Circuit(workout_day_id=day.id, circuit_number=circuit_data["circuit_number"],
+                                     name=circuit_data["name"], rounds=circuit_data["rounds"])
+            db.add(circuit)
+            db.flush()
+            for ex_data in circuit_data["exercises"]:
+                db.add(models.Exercise(circuit_id=circuit.id, name=ex_data["name"], order=ex_data["order"],
+                                       sets=ex_data["sets"], reps=ex_data["reps"]))
+    return plan
+
+
+def bulk_import(db, name, workout_days):
+    plan, _ = write_plan_tree(db, name=name, workout_days=workout_days)
+    return plan
+
+
+def time_import(import_fn, workout_days, repeat):
+    best = None
+    with temp_database() as (_, SessionLocal):
+        for i in range(repeat):
+            db = SessionLocal()
+            try:
+                start = time.perf_counter()
+                import_fn(db, f"Plan {i}", workout_days)
+                db.commit()
+                elapsed = time.perf_counter() - start
+            finally:
+                db.close()
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--weeks", type=int, default=52)
+    arg_parser.add_argument("--days-per-week", type=int, default=5)
+    arg_parser.add_argument("--circuits", type=int, default=3)
+    arg_parser.add_argument("--exercises", type=int, default=5)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    workout_days = synthetic_workout_days(args.weeks, args.days_per_week, args.circuits, args.exercises)
+    rows = count_rows(workout_days)
+
+    results = {"rows": rows}
+    for label, import_fn in [("node_by_node", node_by_node_import), ("bulk", bulk_import)]:
+        elapsed = time_import(import_fn, workout_days, args.repeat)
+        results[label] = {"seconds": round(elapsed, 4), "rows_per_sec": round(rows / elapsed)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
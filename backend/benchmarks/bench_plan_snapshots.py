@@ -0,0 +1,87 @@
+"""
+Benchmark for GET /api/plans/{id}: ORM tree + schema validation vs the stored JSON snapshot.
+
+Seeds plans of increasing size into a fresh SQLite file, then times building the response
+both ways, each with a fresh Session:
+
+- "orm": load the tree (one query per level) and serialize it through schemas.WorkoutPlan,
+  the path used before snapshots
+- "snapshot": read the plan's stored JSON (app.snapshots.plan_snapshot)
+
+Reports the median time, payload size and time per KiB; the snapshot path should scale with
+bytes, the ORM path with the number of objects.
+
+Usage (from backend/):
+    python -m benchmarks.bench_plan_snapshots [--weeks 1 4 12 52] [--repeat 20]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import subqueryload
+
+from app import models, schemas
+from app.plan_writer import write_plan_tree
+from app.snapshots import plan_snapshot
+from benchmarks.common import count_rows, synthetic_workout_days, temp_database
+
+
+def orm_plan_json(db, plan_id: int) -> bytes:
+    plan = db.scalars(
+        select(models.WorkoutPlan).options(
+            subqueryload(models.WorkoutPlan.workout_days)
+            .subqueryload(models.WorkoutDay.circuits)
+            .subqueryload(models.Circuit.exercises)
+        ).where(models.WorkoutPlan.id == plan_id)
+    ).one()
+    return schemas.WorkoutPlan.model_validate(plan).model_dump_json().encode()
+
+
+def time_median(SessionLocal, build, plan_id: int, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            body = build(db, plan_id)
+            timings.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    return statistics.median(timings), body
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--weeks", type=int, nargs="+", default=[1, 4, 12, 52])
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    results = {}
+    with temp_database() as (_, SessionLocal):
+        for weeks in args.weeks:
+            workout_days = synthetic_workout_days(weeks)
+            with SessionLocal() as db:
+                plan, _ = write_plan_tree(db, name=f"{weeks} weeks", workout_days=workout_days)
+                db.commit()
+                plan_id = plan.id
+
+            result = {"objects": count_rows(workout_days)}
+            bodies = {}
+            for label, build in [("orm", orm_plan_json), ("snapshot", plan_snapshot)]:
+                elapsed, bodies[label] = time_median(SessionLocal, build, plan_id, args.repeat)
+                kib = len(bodies[label]) / 1024
+                result[label] = {
+                    "ms": round(elapsed * 1000, 3),
+                    "kib": round(kib, 1),
+                    "us_per_kib": round(elapsed * 1e6 / kib, 2),
+                }
+            result["same_json"] = json.loads(bodies["orm"]) == json.loads(bodies["snapshot"])
+            result["speedup"] = round(result["orm"]["ms"] / result["snapshot"]["ms"], 1)
+            results[f"{weeks}_weeks"] = result
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
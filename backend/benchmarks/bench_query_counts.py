@@ -0,0 +1,114 @@
+"""
+Query counts for the read endpoints, across plan sizes.
+
+Seeds plans of increasing size, each with a workout history, into a fresh SQLite file, calls
+each route function (async ones on an AsyncSession; the routes serialize through their
+response schemas themselves) with the response cache turned off, and profiles the SQL
+issued (app.query_profiler). Counts that grow with plan size mean lazy loading (N+1).
+Exits with status 1 if any endpoint exceeds its budget or repeats a statement.
+
+Usage (from backend/):
+    python -m benchmarks.bench_query_counts [--weeks 1 4 12 52]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+
+from fastapi import Response
+
+from app import models, routes
+from app.query_profiler import profile_queries
+from app.response_cache import ResponseCache
+from app.plan_writer import write_plan_tree
+from benchmarks.common import async_session_factory, temp_database, synthetic_workout_days
+
+# Maximum statements per call, independent of plan size
+QUERY_BUDGETS = {
+    "GET /api/plans": 1,
+    "GET /api/days": 1,
+    "GET /api/plans/{id}": 1,
+    "GET /api/days/{id}": 1,
+    "GET /api/sessions": 2,
+    "GET /api/sessions/{id}": 2,
+}
+
+
+def endpoint_calls(db, async_db, plan, day_id, session_id):
+    sessions_page = dict(limit=50, cursor=None, include_logs=True, from_date=None, to_date=None)
+    return {
+        "GET /api/plans": lambda: routes.get_workout_plans(None, db),
+        "GET /api/days": lambda: routes.get_workout_days(None, None, db),
+        "GET /api/plans/{id}": lambda: routes.get_workout_plan(plan.id, None, db),
+        "GET /api/days/{id}": lambda: routes.get_workout_day(day_id, None, async_db),
+        "GET /api/sessions": lambda: routes.get_all_sessions(Response(), **sessions_page, db=db),
+        "GET /api/sessions/{id}": lambda: routes.get_workout_session(session_id, None, db),
+    }
+
+
+def seed_sessions(db, days, count: int, sets_per_session: int = 10) -> int:
+    """Completed sessions with logged sets, cycling through the plan's days. Returns the last id."""
+    start = datetime.utcnow() - timedelta(days=count)
+    sessions = []
+    for n in range(count):
+        day = days[n % len(days)]
+        exercise_id = day.circuits[0].exercises[0].id
+        session = models.WorkoutSession(workout_day_id=day.id, started_at=start + timedelta(days=n))
+        session.exercise_logs = [
+            models.ExerciseLog(exercise_id=exercise_id, set_number=i + 1, reps_completed=10, weight_used=50.0)
+            for i in range(sets_per_session)
+        ]
+        sessions.append(session)
+    db.add_all(sessions)
+    db.flush()
+    return sessions[-1].id
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--weeks", type=int, nargs="+", default=[1, 4, 12, 52])
+    args = arg_parser.parse_args()
+
+    routes.response_cache = ResponseCache(max_entries=0)  # count the queries behind every call
+    results = {}
+    repeated = {}
+    failed = False
+    loop = asyncio.new_event_loop()
+    with temp_database() as (engine, SessionLocal):
+        async_engine, AsyncSessionLocal = async_session_factory(engine)
+
+        for weeks in args.weeks:
+            db = SessionLocal()
+            plan, _ = write_plan_tree(db, name=f"{weeks} weeks", workout_days=synthetic_workout_days(weeks))
+            session_id = seed_sessions(db, plan.workout_days, count=weeks * 5)
+            db.commit()
+            day_id = plan.workout_days[-1].id
+            db.close()
+
+            for endpoint in QUERY_BUDGETS:
+                # Fresh session per call, so nothing is already in the identity map
+                db = SessionLocal()
+                async_db = AsyncSessionLocal()
+                call = endpoint_calls(db, async_db, plan, day_id, session_id)[endpoint]
+                with profile_queries() as profile:
+                    result = call()
+                    if asyncio.iscoroutine(result):
+                        loop.run_until_complete(result)
+                db.close()
+                loop.run_until_complete(async_db.close())
+                results.setdefault(endpoint, {})[f"{weeks}_weeks"] = profile.count
+                if profile.repeated():
+                    repeated.setdefault(endpoint, profile.repeated())
+                if profile.count > QUERY_BUDGETS[endpoint] or profile.repeated():
+                    failed = True
+
+        loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+    print(json.dumps({"budgets": QUERY_BUDGETS, "queries": results, "repeated": repeated}, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Concurrency benchmark for the SQLite connection profile.
+
+Runs writer threads that log sets the way POST /api/sessions/{id}/log does (look up the
+session, insert one ExerciseLog, commit) next to reader threads running the exercise history
+query, against a fresh database file. Each profile is run in turn:
+
+- "default": SQLite's own defaults (rollback journal, synchronous=FULL)
+- "tuned": app.database.SQLITE_PRAGMAS (WAL etc., as configured by the environment)
+
+Reports write throughput, reader latency percentiles while writes are happening and
+"database is locked" errors, as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite_concurrency [--writers 4] [--readers 4] [--seconds 5]
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app import models
+from app.database import SQLITE_PRAGMAS
+from app.plan_writer import write_plan_tree
+from benchmarks.common import synthetic_workout_days, temp_database
+
+PROFILES = {
+    "default": {"journal_mode": "DELETE", "synchronous": "FULL"},
+    "tuned": SQLITE_PRAGMAS,
+}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_profile(pragmas: Dict[str, str], writers: int, readers: int, seconds: float) -> dict:
+    with temp_database(pragmas) as (engine, SessionLocal):
+        with SessionLocal() as db:
+            plan, _ = write_plan_tree(db, "Bench Plan", synthetic_workout_days(weeks=1))
+            day_id = plan.workout_days[0].id
+            exercise_ids = list(db.scalars(select(models.Exercise.id).limit(20)))
+            session_ids = []
+            for _ in range(writers):
+                session = models.WorkoutSession(workout_day_id=day_id)
+                db.add(session)
+                db.flush()
+                session_ids.append(session.id)
+            db.commit()
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        writes = [0]
+        write_errors = [0]
+        read_errors = [0]
+        read_latencies: List[float] = []
+
+        def writer(session_id: int):
+            n = 0
+            while not stop.is_set():
+                db = SessionLocal()
+                try:
+                    session = db.get(models.WorkoutSession, session_id)
+                    log = models.ExerciseLog(
+                        session_id=session.id,
+                        exercise_id=exercise_ids[n % len(exercise_ids)],
+                        set_number=n % 4 + 1,
+                        reps_completed=10,
+                        weight_used=50.0,
+                    )
+                    db.add(log)
+                    db.commit()
+                    db.refresh(log)
+                    with lock:
+                        writes[0] += 1
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        write_errors[0] += 1
+                finally:
+                    db.close()
+                n += 1
+
+        def reader(offset: int):
+            n = offset
+            while not stop.is_set():
+                start = time.perf_counter()
+                db = SessionLocal()
+                try:
+                    db.scalars(
+                        select(models.ExerciseLog)
+                        .where(models.ExerciseLog.exercise_id == exercise_ids[n % len(exercise_ids)])
+                        .order_by(models.ExerciseLog.logged_at.desc())
+                        .limit(50)
+                    ).all()
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        read_latencies.append(elapsed)
+                except OperationalError:
+                    with lock:
+                        read_errors[0] += 1
+                finally:
+                    db.close()
+                n += 1
+
+        threads = [threading.Thread(target=writer, args=(sid,)) for sid in session_ids]
+        threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with engine.connect() as conn:
+            journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+
+    return {
+        "journal_mode": journal_mode,
+        "writes": writes[0],
+        "writes_per_sec": round(writes[0] / elapsed, 1),
+        "write_errors": write_errors[0],
+        "reads": len(read_latencies),
+        "read_errors": read_errors[0],
+        "read_p50_ms": round(_percentile(read_latencies, 50) * 1000, 2),
+        "read_p95_ms": round(_percentile(read_latencies, 95) * 1000, 2),
+        "read_p99_ms": round(_percentile(read_latencies, 99) * 1000, 2),
+        "read_mean_ms": round(statistics.fmean(read_latencies) * 1000, 2) if read_latencies else 0.0,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--writers", type=int, default=4)
+    arg_parser.add_argument("--readers", type=int, default=4)
+    arg_parser.add_argument("--seconds", type=float, default=5.0)
+    arg_parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    args = arg_parser.parse_args()
+
+    results = {}
+    for name in args.profiles:
+        results[name] = run_profile(PROFILES[name], args.writers, args.readers, args.seconds)
+    print(json.dumps({"writers": args.writers, "readers": args.readers, "seconds": args.seconds,
+                      "profiles": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
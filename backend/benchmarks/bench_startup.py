@@ -0,0 +1,106 @@
+"""
+Startup time: importing app.main, and time to the first HTTP response from uvicorn.
+
+Each measurement starts a fresh Python process in an empty working directory (so ./data is a
+new database):
+
+- "import": time to import app.main, and whether pdfplumber got loaded along the way
+- "first_response": from spawning uvicorn to the first 200 from /health, on a fresh database,
+  on an existing one, and on an existing one with SKIP_MIGRATIONS=1
+
+Reports the median of --repeat runs, in milliseconds, as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [--repeat 5]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+print(json.dumps({"seconds": time.perf_counter() - start, "pdfplumber_loaded": "pdfplumber" in sys.modules}))
+"""
+
+
+def _env(**extra) -> dict:
+    return {**os.environ, "PYTHONPATH": BACKEND_DIR, **extra}
+
+
+def measure_import(work_dir: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT], cwd=work_dir, env=_env(),
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(work_dir: str, timeout: float = 60.0, **env) -> float:
+    """Seconds from spawning uvicorn until GET /health answers."""
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=work_dir, env=_env(**env), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError("uvicorn did not answer /health")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    imports, pdfplumber_loaded = [], False
+    first_response = {"fresh_db": [], "existing_db": [], "existing_db_skip_migrations": []}
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = measure_import(work_dir)
+            imports.append(result["seconds"])
+            pdfplumber_loaded = pdfplumber_loaded or result["pdfplumber_loaded"]
+        with tempfile.TemporaryDirectory() as work_dir:
+            first_response["fresh_db"].append(measure_first_response(work_dir))
+            first_response["existing_db"].append(measure_first_response(work_dir))
+            first_response["existing_db_skip_migrations"].append(
+                measure_first_response(work_dir, SKIP_MIGRATIONS="1"))
+
+    print(json.dumps({
+        "import_ms": round(statistics.median(imports) * 1000, 1),
+        "pdfplumber_loaded_at_import": pdfplumber_loaded,
+        "first_response_ms": {
+            label: round(statistics.median(values) * 1000, 1) for label, values in first_response.items()
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
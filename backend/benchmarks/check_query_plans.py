@@ -0,0 +1,194 @@
+"""
+EXPLAIN QUERY PLAN check for the API routes.
+
+Seeds a fresh SQLite file with a plan and a workout history, calls each route function (async
+ones on an AsyncSession), captures every SQL statement it issues and runs EXPLAIN QUERY PLAN
+on it. A full scan of a table (a "SCAN <table>" step) fails the check unless the route lists
+that table in ALLOWED_SCANS, i.e. it returns every row of the table anyway. Walking an index in
+order under a LIMIT ("SCAN <table> USING INDEX" for a paged query) is not a full scan.
+Exits with status 1 on any unexpected scan.
+
+Usage (from backend/):
+    python -m benchmarks.check_query_plans [--verbose]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date, datetime, timedelta
+
+from fastapi import Response
+from sqlalchemy import event, inspect
+
+from app import models, routes, schemas
+from app.response_cache import ResponseCache
+from app.migrations import run_migrations
+from app.plan_writer import write_plan_tree
+from benchmarks.common import async_session_factory, synthetic_workout_days, temp_database
+
+# Tables a route may read in full because it lists all of their rows
+ALLOWED_SCANS = {
+    "GET /api/plans": {"workout_plans"},
+    "GET /api/days": {"workout_days"},
+}
+
+# Single-row tables, fine to scan from any route
+SINGLE_ROW_TABLES = {"user_stats", "change_counter"}
+
+
+def route_calls(db, async_db, ids):
+    """Route name -> zero-argument callable; async routes return a coroutine."""
+    plan_id, day_id, session_id, exercise_id = ids["plan"], ids["day"], ids["session"], ids["exercise"]
+    sessions_page = dict(limit=50, cursor=None, include_logs=True, from_date=None, to_date=None)
+    log = schemas.ExerciseLogCreate(exercise_id=exercise_id, set_number=1, reps_completed=10,
+                                    weight_used=50.0, idempotency_key="plan-check-1")
+
+    def next_page():
+        response = Response()
+        routes.get_all_sessions(response, **sessions_page, db=db)
+        cursor = response.headers["X-Next-Cursor"]
+        return routes.get_all_sessions(Response(), **{**sessions_page, "cursor": cursor}, db=db)
+
+    return {
+        "GET /api/plans": lambda: routes.get_workout_plans(None, db),
+        "GET /api/plans/{id}": lambda: routes.get_workout_plan(plan_id, None, db),
+        "GET /api/days": lambda: routes.get_workout_days(None, None, db),
+        "GET /api/days?plan_id": lambda: routes.get_workout_days(plan_id, None, db),
+        "GET /api/days/{id}": lambda: routes.get_workout_day(day_id, None, async_db),
+        "GET /api/sessions": lambda: routes.get_all_sessions(Response(), **sessions_page, db=db),
+        "GET /api/sessions?cursor": next_page,
+        "GET /api/sessions?from_date": lambda: routes.get_all_sessions(
+            Response(), **{**sessions_page, "from_date": datetime.utcnow() - timedelta(days=30)}, db=db),
+        "GET /api/sessions/{id}": lambda: routes.get_workout_session(session_id, None, db),
+        "GET /api/exercises/{id}/history": lambda: routes.get_exercise_history(exercise_id, async_db),
+        "GET /api/sync": lambda: routes.sync_changes(10, db),
+        "GET /api/stats": lambda: routes.get_user_stats(db),
+        "GET /api/stats/rollups": lambda: routes.get_training_rollups(
+            "week", False, date.today() - timedelta(days=90), None, db),
+        "POST /api/sessions": lambda: routes.start_workout_session(
+            schemas.WorkoutSessionCreate(workout_day_id=day_id, idempotency_key="plan-check"), async_db),
+        "POST /api/sessions/{id}/log": lambda: routes.log_exercise(session_id, log, async_db),
+        "POST /api/sessions/{id}/logs": lambda: routes.log_exercises(session_id, [log], async_db),
+        "PATCH /api/sessions/{id}": lambda: routes.update_workout_session(
+            session_id, schemas.WorkoutSessionUpdate(completed_at=datetime.utcnow(), duration_minutes=40),
+            async_db),
+        "DELETE /api/sessions/{id}": lambda: routes.delete_workout_session(ids["spare_session"], db),
+    }
+
+
+def seed(SessionLocal, plans: int = 4, sessions: int = 200, sets_per_session: int = 20) -> dict:
+    """A few 12-week plans and a history of completed sessions with logged sets on the first."""
+    with SessionLocal() as db:
+        for n in range(1, plans):
+            write_plan_tree(db, f"Other Plan {n}", synthetic_workout_days(weeks=12))
+        plan, _ = write_plan_tree(db, "Plan Check", synthetic_workout_days(weeks=12))
+        db.flush()
+        days = plan.workout_days
+        day_exercise_ids = [[e.id for c in day.circuits for e in c.exercises] for day in days]
+        start = datetime.utcnow() - timedelta(days=sessions)
+        session_rows = []
+        for n in range(sessions):
+            started = start + timedelta(days=n)
+            exercise_ids = day_exercise_ids[n % len(days)]
+            session = models.WorkoutSession(
+                workout_day_id=days[n % len(days)].id, started_at=started,
+                completed_at=started + timedelta(minutes=50), duration_minutes=50
+            )
+            session.exercise_logs = [
+                models.ExerciseLog(exercise_id=exercise_ids[i % len(exercise_ids)], set_number=i // 4 + 1,
+                                   reps_completed=10, weight_used=40.0 + n % 20, logged_at=started)
+                for i in range(sets_per_session)
+            ]
+            session_rows.append(session)
+        db.add_all(session_rows)
+        db.add(models.UserStats())
+        db.commit()
+        return {
+            "plan": plan.id,
+            "day": days[0].id,
+            "session": session_rows[-1].id,
+            "spare_session": session_rows[0].id,
+            "exercise": day_exercise_ids[0][0],
+        }
+
+
+def full_scans(conn, statement, parameters, tables):
+    """Tables a statement reads with a full scan, and the raw plan."""
+    limited = " LIMIT " in statement.upper()
+    if not isinstance(parameters, dict):
+        parameters = tuple(parameters)  # a list would be taken as executemany parameter sets
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    scanned = []
+    for row in plan:
+        words = row[-1].split()
+        # "SCAN workout_days", "SCAN workout_days USING COVERING INDEX ..."; a real table, not a subquery
+        if words[:1] != ["SCAN"] or len(words) < 2 or words[1] not in tables:
+            continue
+        if words[1] in SINGLE_ROW_TABLES or (limited and "INDEX" in words):
+            continue
+        scanned.append(words[1])
+    return scanned, [row[-1] for row in plan]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--verbose", action="store_true", help="print every statement's plan")
+    args = arg_parser.parse_args()
+
+    routes.response_cache = ResponseCache(max_entries=0)  # every call goes to the database
+    loop = asyncio.new_event_loop()
+    report = {}
+    failed = False
+    with temp_database() as (engine, SessionLocal):
+        run_migrations(engine)
+        ids = seed(SessionLocal)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+            conn.commit()
+        tables = set(inspect(engine).get_table_names())
+
+        async_engine, AsyncSessionLocal = async_session_factory(engine)
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            # executemany passes a list of parameter sets (insertmanyvalues batches pass one flat set)
+            if executemany and parameters and isinstance(parameters[0], (list, tuple, dict)):
+                parameters = parameters[0]
+            captured.append((statement, parameters))
+
+        for sync_engine in (engine, async_engine.sync_engine):
+            event.listen(sync_engine, "before_cursor_execute", capture)
+
+        for route in route_calls(None, None, ids):
+            db = SessionLocal()
+            async_db = AsyncSessionLocal()
+            captured.clear()
+            result = route_calls(db, async_db, ids)[route]()
+            if asyncio.iscoroutine(result):
+                loop.run_until_complete(result)
+            db.close()
+            loop.run_until_complete(async_db.close())
+            statements = list(captured)
+
+            entries = []
+            with engine.connect() as conn:
+                for statement, parameters in statements:
+                    scanned, plan = full_scans(conn, statement, parameters, tables)
+                    unexpected = sorted(set(scanned) - ALLOWED_SCANS.get(route, set()))
+                    if unexpected or args.verbose:
+                        entries.append({"sql": " ".join(statement.split()), "plan": plan,
+                                        "unexpected_scans": unexpected})
+                    failed = failed or bool(unexpected)
+            report[route] = {"statements": len(statements), "details": entries}
+
+        loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+    print(json.dumps(report, indent=2))
+    print("FAIL: full table scans found" if failed else "OK: no unexpected full table scans",
+          file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Shared helpers for benchmarks: throwaway databases and synthetic plan data."""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_async_db_engine, create_db_engine, to_async_url
+from app import models  # noqa: F401  (registers tables on Base)
+
+EXERCISE_NAMES = [
+    "Barbell Bench Press", "Incline Dumbbell Press", "Cable Fly", "Lat Pulldown",
+    "Seated Cable Row", "Barbell Back Squat", "Romanian Deadlift", "Walking Lunge",
+    "Dumbbell Lateral Raise", "Face Pull", "Hammer Curl", "Rope Pushdown",
+]
+
+
+@contextmanager
+def temp_database(pragmas: Optional[Dict[str, str]] = None):
+    """
+    Yield (engine, SessionLocal) for a fresh SQLite file with all tables created.
+    pragmas defaults to the app's SQLITE_PRAGMAS, so benchmarks see the production setup.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", pragmas)
+        Base.metadata.create_all(bind=engine)
+        try:
+            yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        finally:
+            engine.dispose()
+
+
+def async_session_factory(engine, pragmas: Optional[Dict[str, str]] = None):
+    """
+    (async_engine, AsyncSessionLocal) on the same database file as a temp_database() engine,
+    configured like app.database.AsyncSessionLocal. Dispose the engine when done.
+    """
+    url = to_async_url(engine.url.render_as_string(hide_password=False))
+    async_engine = create_async_db_engine(url, pragmas)
+    return async_engine, async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def synthetic_workout_days(weeks: int = 12, days_per_week: int = 5, circuits_per_day: int = 3,
+                           exercises_per_circuit: int = 4) -> List[Dict[str, Any]]:
+    """Plan days in the parser's dict layout."""
+    days = []
+    for day_num in range(1, weeks * days_per_week + 1):
+        week, day = (day_num - 1) // days_per_week + 1, (day_num - 1) % days_per_week + 1
+        circuits = []
+        for circuit_num in range(1, circuits_per_day + 1):
+            exercises = [
+                {
+                    "name": EXERCISE_NAMES[(day_num + circuit_num + order) % len(EXERCISE_NAMES)],
+                    "order": order,
+                    "sets": "3",
+                    "reps": "10-12",
+                    "weight_recommendation": None,
+                    "notes": None,
+                }
+                for order in range(1, exercises_per_circuit + 1)
+            ]
+            circuits.append({"circuit_number": circuit_num, "name": f"Circuit {circuit_num}",
+                             "rounds": 3, "exercises": exercises})
+        days.append({"name": f"Week {week}, Day {day}", "day_number": day_num,
+                     "muscle_groups": "Chest, Back", "circuits": circuits})
+    return days
+
+
+def count_rows(days: List[Dict[str, Any]]) -> int:
+    """Rows a plan tree inserts: plan + days + circuits + exercises."""
+    circuits = [c for d in days for c in d["circuits"]]
+    return 1 + len(days) + len(circuits) + sum(len(c["exercises"]) for c in circuits)
@@ -0,0 +1,139 @@
+"""
+Synthetic workout program PDFs for parser benchmarks.
+
+Writes minimal PDF files by hand (no extra dependencies) in the two layouts the parser
+understands:
+
+- "table": one ruled table per page, a "Week X, Day Y: PUSH" header row, a column header
+  row and exercise rows, as read by _parse_tables
+- "text": free text with day headers, circuit headers and "3x10" style exercise lines,
+  as read by _parse_workout_text
+
+Usage (from backend/):
+    python -m benchmarks.pdf_generator OUT.pdf --pages 100 --layout table
+"""
+import argparse
+import random
+from typing import List, Tuple
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 50
+ROW_HEIGHT = 20
+FONT_SIZE = 9
+
+EXERCISES = [
+    "Barbell Bench Press", "Incline Dumbbell Press", "Cable Fly", "Lat Pulldown",
+    "Seated Cable Row", "Barbell Back Squat", "Romanian Deadlift", "Walking Lunge",
+    "Dumbbell Lateral Raise", "Face Pull", "Hammer Curl", "Rope Pushdown",
+    "Overhead Tricep Extension", "Leg Raise", "Pull Up", "Push Up",
+]
+WORKOUT_TYPES = ["PUSH", "PULL", "LEGS", "UPPER", "LOWER"]
+NOTES = ["Slow eccentric", "Pause at the bottom", "Drop set on the last set", ""]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text(x: float, y: float, text: str) -> str:
+    return f"BT /F1 {FONT_SIZE} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET"
+
+
+def _table_page(rng: random.Random, week: int, day: int) -> str:
+    """Content stream for one ruled table page."""
+    rows: List[Tuple[str, ...]] = [
+        (f"Week {week}, Day {day}: {rng.choice(WORKOUT_TYPES)}", "", "", ""),
+        ("Exercise", "Sets", "Reps", "Notes"),
+    ]
+    for name in rng.sample(EXERCISES, rng.randint(5, 9)):
+        rows.append((name, str(rng.randint(3, 5)), rng.choice(["8-10", "10-12", "15, 12, 10", "AMRAP"]),
+                     rng.choice(NOTES)))
+
+    col_x = [MARGIN, MARGIN + 220, MARGIN + 280, MARGIN + 360, PAGE_WIDTH - MARGIN]
+    top = PAGE_HEIGHT - MARGIN
+    bottom = top - ROW_HEIGHT * len(rows)
+
+    ops = ["0.5 w"]
+    for i in range(len(rows) + 1):
+        y = top - i * ROW_HEIGHT
+        ops.append(f"{col_x[0]} {y} m {col_x[-1]} {y} l S")
+    for x in col_x:
+        ops.append(f"{x} {top} m {x} {bottom} l S")
+    for i, row in enumerate(rows):
+        y = top - (i + 1) * ROW_HEIGHT + 6
+        for x, cell in zip(col_x, row):
+            if cell:
+                ops.append(_text(x + 4, y, cell))
+    return "\n".join(ops)
+
+
+def _text_page(rng: random.Random, day: int) -> str:
+    """Content stream for one free-text page."""
+    lines = [f"Day {day} - {rng.choice(['Chest', 'Back', 'Legs', 'Shoulders', 'Arms'])}"]
+    for circuit in range(1, rng.randint(2, 4) + 1):
+        lines.append(f"Circuit {circuit} - {rng.randint(3, 4)} rounds")
+        for name in rng.sample(EXERCISES, rng.randint(3, 5)):
+            lines.append(f"{name} {rng.randint(3, 5)}x{rng.choice([8, 10, 12, 15])} {rng.randint(20, 135)} lbs")
+        lines.append("Rest 60 seconds between rounds")
+
+    top = PAGE_HEIGHT - MARGIN
+    return "\n".join(_text(MARGIN, top - i * ROW_HEIGHT, line) for i, line in enumerate(lines))
+
+
+def generate_pdf(path: str, pages: int, layout: str = "table", seed: int = 0):
+    """Write a program PDF with the given page count and layout ("table" or "text")."""
+    if layout not in ("table", "text"):
+        raise ValueError(f"Unknown layout: {layout}")
+    rng = random.Random(seed)
+
+    streams = [_text(MARGIN, PAGE_HEIGHT - MARGIN, "Synthetic Training Program - 12 Week Plan")]
+    for page in range(1, pages):
+        week, day = (page - 1) // 5 + 1, (page - 1) % 5 + 1
+        streams.append(_table_page(rng, week, day) if layout == "table" else _text_page(rng, page))
+
+    # Object numbers: 1 catalog, 2 pages, 3 font, then (page, content) pairs
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, filled in once page object numbers are known
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for stream in streams:
+        page_num = len(objects) + 1
+        page_refs.append(f"{page_num} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_num + 1} 0 R >>"
+        )
+        data = stream.encode("latin-1")
+        objects.append(f"<< /Length {len(data)} >>\nstream\n{stream}\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("output")
+    arg_parser.add_argument("--pages", type=int, default=100)
+    arg_parser.add_argument("--layout", choices=["table", "text"], default="table")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+    generate_pdf(args.output, args.pages, args.layout, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Shared pytest fixtures. Run from backend/: python -m pytest
+
+    def test_get_plan(client, query_budget):
+        with query_budget(1):
+            client.get("/api/plans/1")
+"""
+import os
+
+import pytest
+
+from app.query_profiler import query_budget as _query_budget
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """TestClient for the app on a fresh database and uploads directory, shared by the session."""
+    work_dir = tmp_path_factory.mktemp("app")
+    # The engines and UPLOAD_DIR are set up at import, so point them here before importing the app
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'test.db'}"
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def query_budget():
+    """
+    app.query_profiler.query_budget: with query_budget(n) fails the test if the block issues
+    more than n SQL statements, or repeats one (N+1) unless allow_repeated=True.
+    """
+    return _query_budget
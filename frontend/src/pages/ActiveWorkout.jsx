@@ -19,6 +19,13 @@ function getExerciseColor(exerciseName) {
   return '#6b7280'
 }
 
+// Key the server uses to drop retried logs. crypto.randomUUID needs a secure context,
+// which a plain-HTTP LAN install does not have.
+function newIdempotencyKey() {
+  if (window.crypto?.randomUUID) return window.crypto.randomUUID()
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}-${Math.random().toString(36).slice(2)}`
+}
+
 function ActiveWorkout({ onComplete }) {
   const { sessionId } = useParams()
   const navigate = useNavigate()
@@ -36,10 +43,38 @@ function ActiveWorkout({ onComplete }) {
   const [showExerciseDetail, setShowExerciseDetail] = useState(false)
   
   const timerRef = useRef(null)
+  // Sets not yet sent to the server; flushed as one batch when an exercise is finished
+  const pendingLogs = useRef([])
+  // Sets sent but not yet acknowledged
+  const sendingLogs = useRef([])
+  // Both are mirrored here until the server has them, so a reload or a killed tab loses nothing
+  const storageKey = `pendingLogs:${sessionId}`
 
   useEffect(() => {
+    // Sets left from an earlier visit that the server may not have received
+    try {
+      pendingLogs.current = JSON.parse(localStorage.getItem(storageKey)) || []
+    } catch {
+      pendingLogs.current = []
+    }
     fetchSession()
-    return () => clearInterval(timerRef.current)
+    flushLogs()
+    
+    // Refresh, tab close, or a phone backgrounding the browser during rest: send what is
+    // buffered now, since the page may not get another chance
+    const flushOnLeave = () => flushLogs({ keepalive: true })
+    const flushOnHide = () => {
+      if (document.visibilityState === 'hidden') flushOnLeave()
+    }
+    window.addEventListener('pagehide', flushOnLeave)
+    document.addEventListener('visibilitychange', flushOnHide)
+    return () => {
+      window.removeEventListener('pagehide', flushOnLeave)
+      document.removeEventListener('visibilitychange', flushOnHide)
+      clearInterval(timerRef.current)
+      // Leaving the workout early: send whatever is still buffered
+      flushOnLeave()
+    }
   }, [sessionId])
 
   useEffect(() => {
@@ -130,15 +165,16 @@ function ActiveWorkout({ onComplete }) {
       [getSetKey()]: { weight: weight || null }
     }))
     
-    // Log to database
-    await logExercise()
+    // Queue the set; the batch is sent once the exercise is done
+    logExercise()
     
     // Check if more sets remain for this exercise
     if (currentSet < totalSets) {
       // Move to next set of SAME exercise
       setCurrentSet(currentSet + 1)
     } else {
-      // All sets done, move to next exercise
+      // All sets done, save them and move to next exercise
+      await flushLogs()
       const circuit = workout.circuits[currentCircuit]
       
       if (currentExercise < circuit.exercises.length - 1) {
@@ -179,29 +215,72 @@ function ActiveWorkout({ onComplete }) {
     }
   }
 
-  const logExercise = async () => {
+  const logExercise = () => {
     const exercise = getCurrentExerciseData()
     if (!exercise) return
     
+    pendingLogs.current.push({
+      exercise_id: exercise.id,
+      set_number: currentSet,
+      reps_completed: parseInt(getReps()) || 10,
+      weight_used: weight ? parseFloat(weight) : null,
+      completed: true,
+      idempotency_key: newIdempotencyKey()
+    })
+    savePendingLogs()
+  }
+
+  const savePendingLogs = () => {
+    const logs = [...sendingLogs.current, ...pendingLogs.current]
+    try {
+      if (logs.length > 0) {
+        localStorage.setItem(storageKey, JSON.stringify(logs))
+      } else {
+        localStorage.removeItem(storageKey)
+      }
+    } catch (err) {
+      console.error('Failed to save pending sets:', err)
+    }
+  }
+
+  const flushLogs = async ({ keepalive = false } = {}) => {
+    const logs = pendingLogs.current
+    if (logs.length === 0) return
+    pendingLogs.current = []
+    sendingLogs.current = [...sendingLogs.current, ...logs]
+    
+    // Server errors (including lock timeouts) and network errors keep the sets for the next
+    // batch. The request may have reached the server; idempotency keys stop the retry from
+    // duplicating them. A 4xx would be rejected again, so those sets are dropped.
+    let retry = false
     try {
-      await fetch(`/api/sessions/${sessionId}/log`, {
+      const res = await fetch(`/api/sessions/${sessionId}/logs`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          exercise_id: exercise.id,
-          set_number: currentSet,
-          reps_completed: parseInt(getReps()) || 10,
-          weight_used: weight ? parseFloat(weight) : null,
-          completed: true
-        })
+        body: JSON.stringify(logs),
+        keepalive
       })
+      if (res.status >= 500) {
+        retry = true
+        console.error('Failed to log sets, will retry:', res.status)
+      } else if (!res.ok) {
+        console.error('Sets rejected:', res.status)
+      }
     } catch (err) {
-      console.error('Failed to log exercise:', err)
+      retry = true
+      console.error('Failed to log sets, will retry:', err)
+    }
+    
+    sendingLogs.current = sendingLogs.current.filter(log => !logs.includes(log))
+    if (retry) {
+      pendingLogs.current = [...logs, ...pendingLogs.current]
     }
+    savePendingLogs()
   }
 
   const completeWorkout = async () => {
     try {
+      await flushLogs()
       await fetch(`/api/sessions/${sessionId}`, {
         method: 'PATCH',
         headers: { 'Content-Type': 'application/json' },
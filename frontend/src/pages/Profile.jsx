@@ -61,7 +61,7 @@ function Profile() {
       setStats(statsData)
 
       // Fetch workout history (sessions)
-      const historyRes = await fetch('/api/sessions')
+      const historyRes = await fetch('/api/sessions?include_logs=false&limit=10')
       if (historyRes.ok) {
         const historyData = await historyRes.json()
         setWorkoutHistory(historyData)
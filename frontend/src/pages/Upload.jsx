@@ -9,6 +9,7 @@ function Upload() {
   const [file, setFile] = useState(null)
   const [planName, setPlanName] = useState('')
   const [uploading, setUploading] = useState(false)
+  const [progress, setProgress] = useState(null)
   const [result, setResult] = useState(null)
   const [error, setError] = useState(null)
   const [dragActive, setDragActive] = useState(false)
@@ -49,11 +50,25 @@ function Upload() {
     setResult(null)
   }
 
+  const pollJob = async (jobId) => {
+    // Parsing runs in the background; poll until the job finishes
+    while (true) {
+      await new Promise(resolve => setTimeout(resolve, 1000))
+      const res = await fetch(`/api/jobs/${jobId}`)
+      const job = await res.json()
+      if (!res.ok) throw new Error(job.detail || 'Upload failed')
+      
+      setProgress(job)
+      if (job.state === 'completed' || job.state === 'failed') return job
+    }
+  }
+
   const handleUpload = async () => {
     if (!file) return
     
     setUploading(true)
     setError(null)
+    setProgress(null)
     
     const formData = new FormData()
     formData.append('file', file)
@@ -69,15 +84,22 @@ function Upload() {
       
       const data = await res.json()
       
-      if (res.ok) {
-        setResult(data)
-      } else {
+      if (!res.ok) {
         setError(data.detail || 'Upload failed')
+        return
+      }
+      
+      const job = await pollJob(data.id)
+      if (job.state === 'completed') {
+        setResult(job)
+      } else {
+        setError(job.message || 'Upload failed')
       }
     } catch (err) {
       setError('Failed to upload file. Please try again.')
     } finally {
       setUploading(false)
+      setProgress(null)
     }
   }
 
@@ -231,7 +253,11 @@ function Upload() {
               {uploading ? (
                 <>
                   <Loader size={20} className="animate-pulse" />
-                  <span>Processing PDF...</span>
+                  <span>
+                    {progress && progress.pages_total
+                      ? `Processing PDF... ${progress.pages_done}/${progress.pages_total} pages`
+                      : 'Processing PDF...'}
+                  </span>
                 </>
               ) : (
                 <>